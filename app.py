@@ -44,11 +44,6 @@ from datetime import datetime
 import os
 import traceback
 import logging
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
 import json
 import csv
 import codecs
@@ -111,15 +106,29 @@ limiter = Limiter(
 # =============================================
 
 def run_migrations_on_startup():
-    """Executa migrações pendentes no startup (PostgreSQL apenas)"""
+    """
+    Executa migrações pendentes no startup (PostgreSQL apenas)
+    
+    SKIP_STARTUP_MIGRATIONS=1 desliga a execução (deploy que já roda
+    run_migrations.py antes, como o release_command do Fly.io). O sentinela
+    migrations/.last_applied evita consultar o banco a cada boot de worker
+    quando nenhuma migração nova foi adicionada.
+    """
     import sys as _sys
+    if os.environ.get('SKIP_STARTUP_MIGRATIONS') == '1':
+        print("⏭️  Migrações no startup desativadas (SKIP_STARTUP_MIGRATIONS)", flush=True)
+        return
+    
     if Config.IS_POSTGRES and Config.DATABASE_URL:
         try:
-            print("🔧 PostgreSQL detectado - Executando migrações automaticamente...", flush=True)
-            _sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'migrations'))
-            from migration_manager import MigrationManager
+            from migrations.migration_manager import MigrationManager
             
             manager = MigrationManager(database_url=Config.DATABASE_URL)
+            if manager.is_up_to_date():
+                print("✅ Migrações em dia (sentinela) - nada a executar", flush=True)
+                return
+            
+            print("🔧 PostgreSQL detectado - Executando migrações automaticamente...", flush=True)
             result = manager.run_pending_migrations()
             if result.get('success'):
                 print(f"✅ Migrações concluídas! {result.get('migrations_run', 0)} aplicada(s)", flush=True)
@@ -296,6 +305,9 @@ def internal_error(error):
 def forbidden_error(error):
     return render_template('errors/403.html'), 403
 
+# Troca separadores en-US -> pt-BR (1,234.56 -> 1.234,56) em uma única passada
+_SEPARADORES_BR = str.maketrans(',.', '.,')
+
 # Filtro personalizado para formatação de moeda brasileira
 @app.template_filter('moeda_br')
 def moeda_br_filter(valor):
@@ -303,7 +315,7 @@ def moeda_br_filter(valor):
     if valor is None:
         return 'R$ 0,00'
     try:
-        return f"R$ {float(valor):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        return f"R$ {float(valor):,.2f}".translate(_SEPARADORES_BR)
     except (ValueError, TypeError):
         return 'R$ 0,00'
 
@@ -2612,6 +2624,33 @@ def get_orcamento_whatsapp(manutencao_id):
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
+def proximo_numero_os(cursor, empresa_id):
+    """
+    Gera o próximo numero_os da empresa a partir de uma sequence própria.
+    
+    A sequence (ordens_servico_seq_<empresa_id>) é criada na primeira
+    chamada, continuando do maior número já emitido para a empresa. A
+    criação roda sob advisory lock da transação: duas primeiras OS
+    simultâneas da mesma empresa não semeiam a sequence duas vezes.
+    """
+    seq = f"ordens_servico_seq_{int(empresa_id)}"
+    
+    cursor.execute("SELECT to_regclass(%s)", (seq,))
+    if cursor.fetchone()[0] is None:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (seq,))
+        # Outra transação pode ter criado a sequence enquanto esperávamos o lock
+        cursor.execute("SELECT to_regclass(%s)", (seq,))
+        if cursor.fetchone()[0] is None:
+            cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {seq}")
+            cursor.execute("""
+                SELECT setval(%s, COALESCE(MAX(CAST(SUBSTRING(numero_os FROM 'OS-([0-9]+)') AS INTEGER)), 0) + 1, false)
+                FROM ordens_servico WHERE empresa_id = %s
+            """, (seq, empresa_id))
+    
+    cursor.execute("SELECT nextval(%s)", (seq,))
+    return f"OS-{cursor.fetchone()[0]:06d}"
+
+
 @app.route('/api/manutencao/<int:manutencao_id>/aprovar-orcamento', methods=['POST'])
 @login_required
 def aprovar_orcamento(manutencao_id):
@@ -2657,17 +2696,10 @@ def aprovar_orcamento(manutencao_id):
             cliente_id = manut_data[1]
             valor_servicos = manut_data[2] or 0
             
-            # Gerar número da OS
-            cursor.execute("""
-                SELECT COALESCE(MAX(CAST(SUBSTRING(numero_os FROM 'OS-([0-9]+)') AS INTEGER)), 0) + 1
-                FROM ordens_servico WHERE empresa_id = %s
-            """, (empresa_id,))
-            prox_num = cursor.fetchone()[0]
-            numero_os = f"OS-{prox_num:06d}"
-            
             # Verificar se já existe OS para esta manutenção
             cursor.execute("SELECT id FROM ordens_servico WHERE manutencao_id = %s", (manutencao_id,))
             if not cursor.fetchone():
+                numero_os = proximo_numero_os(cursor, empresa_id)
                 cursor.execute("""
                     INSERT INTO ordens_servico (empresa_id, manutencao_id, cliente_id, numero_os, status, valor_servicos, data_aprovacao)
                     VALUES (%s, %s, %s, %s, 'APROVADO', %s, CURRENT_TIMESTAMP)
@@ -3284,6 +3316,11 @@ def delete_manutencao(manutencao_id):
         
         conn = psycopg2.connect(Config.DATABASE_URL)
         cursor = conn.cursor()
+        # Remover itens de serviço antes do pai (o CASCADE vira no-op)
+        cursor.execute('''
+            DELETE FROM manutencao_servicos 
+            WHERE manutencao_id IN (SELECT id FROM manutencoes WHERE id = %s AND empresa_id = %s)
+        ''', (manutencao_id, empresa_id))
         cursor.execute('DELETE FROM manutencoes WHERE id = %s AND empresa_id = %s', 
                        (manutencao_id, empresa_id))
         conn.commit()
@@ -5496,6 +5533,11 @@ def exportar_pdf_completo():
     
     try:
         from io import BytesIO
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib import colors
+        from reportlab.lib.units import inch
         
         # Obter filtros
         data_inicial = request.args.get('data_inicial', '')
@@ -5712,6 +5754,11 @@ def exportar_pdf():
     
     try:
         from io import BytesIO
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib import colors
+        from reportlab.lib.units import inch
         
         # Obter filtros
         data_inicial = request.args.get('data_inicial', '')
@@ -6037,6 +6084,11 @@ def exportar_csv():
 def gerar_catalogo_pdf(empresa_id):
     """Gera um PDF detalhado com todas as peças do catálogo da empresa (stateless - BytesIO)"""
     from io import BytesIO
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
     
     # Buscar todas as peças do banco (filtrado por empresa)
     conn = psycopg2.connect(Config.DATABASE_URL)
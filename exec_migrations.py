@@ -1,8 +1,8 @@
 import os
 import sys
-sys.path.insert(0, '/app/migrations')
+sys.path.insert(0, '/app')
 
-from migration_manager import MigrationManager
+from migrations.migration_manager import MigrationManager
 
 DATABASE_URL = os.environ['DATABASE_URL']
 manager = MigrationManager(database_url=DATABASE_URL, migrations_dir='/app/migrations')
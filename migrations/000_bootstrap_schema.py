@@ -25,8 +25,12 @@ IMPORTANTE: Esta migração DEVE ser a primeira a rodar (versão 000).
             As migrações posteriores (001+) dependem destas tabelas.
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Bootstrap do schema base do sistema"""
@@ -45,14 +49,14 @@ class Migration(BaseMigration):
                 self._create_sqlite_schema(cursor)
             
             conn.commit()
-            print("   ✅ Schema base criado com sucesso!")
+            logger.info("   ✅ Schema base criado com sucesso!")
             
         except Exception as e:
             conn.rollback()
             raise Exception(f"Erro ao criar schema base: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
     
     def _create_postgres_schema(self, cursor):
         """Criar schema para PostgreSQL"""
@@ -60,7 +64,7 @@ class Migration(BaseMigration):
         # =============================================
         # 1. TABELA EMPRESAS (BASE MULTI-TENANCY)
         # =============================================
-        print("   📝 Criando tabela empresas...")
+        logger.info("   📝 Criando tabela empresas...")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS empresas (
                 id BIGSERIAL PRIMARY KEY,
@@ -85,7 +89,7 @@ class Migration(BaseMigration):
         # =============================================
         # 2. TABELA USUARIOS (AUTENTICAÇÃO)
         # =============================================
-        print("   📝 Criando tabela usuarios...")
+        logger.info("   📝 Criando tabela usuarios...")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS usuarios (
                 id BIGSERIAL PRIMARY KEY,
@@ -110,7 +114,7 @@ class Migration(BaseMigration):
         # =============================================
         # 3. TABELA LOGS_ACOES (AUDITORIA)
         # =============================================
-        print("   📝 Criando tabela logs_acoes...")
+        logger.info("   📝 Criando tabela logs_acoes...")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS logs_acoes (
                 id BIGSERIAL PRIMARY KEY,
@@ -130,7 +134,7 @@ class Migration(BaseMigration):
         # =============================================
         # 4. TABELA VEICULOS
         # =============================================
-        print("   📝 Criando tabela veiculos...")
+        logger.info("   📝 Criando tabela veiculos...")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS veiculos (
                 id BIGSERIAL PRIMARY KEY,
@@ -160,7 +164,7 @@ class Migration(BaseMigration):
         # =============================================
         # 5. TABELA FORNECEDORES
         # =============================================
-        print("   📝 Criando tabela fornecedores...")
+        logger.info("   📝 Criando tabela fornecedores...")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS fornecedores (
                 id BIGSERIAL PRIMARY KEY,
@@ -186,7 +190,7 @@ class Migration(BaseMigration):
         # =============================================
         # 6. TABELA PECAS
         # =============================================
-        print("   📝 Criando tabela pecas...")
+        logger.info("   📝 Criando tabela pecas...")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS pecas (
                 id BIGSERIAL PRIMARY KEY,
@@ -228,7 +232,7 @@ class Migration(BaseMigration):
         # =============================================
         # 7. TABELA MANUTENCOES
         # =============================================
-        print("   📝 Criando tabela manutencoes...")
+        logger.info("   📝 Criando tabela manutencoes...")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS manutencoes (
                 id BIGSERIAL PRIMARY KEY,
@@ -262,7 +266,7 @@ class Migration(BaseMigration):
         # =============================================
         # 8. TABELA MANUTENCAO_PECAS
         # =============================================
-        print("   📝 Criando tabela manutencao_pecas...")
+        logger.info("   📝 Criando tabela manutencao_pecas...")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS manutencao_pecas (
                 id BIGSERIAL PRIMARY KEY,
@@ -295,7 +299,7 @@ class Migration(BaseMigration):
         # =============================================
         # 9. TABELA HISTORICO_ESTOQUE
         # =============================================
-        print("   📝 Criando tabela historico_estoque...")
+        logger.info("   📝 Criando tabela historico_estoque...")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS historico_estoque (
                 id BIGSERIAL PRIMARY KEY,
@@ -327,7 +331,7 @@ class Migration(BaseMigration):
         # =============================================
         # 10. TABELA TECNICOS
         # =============================================
-        print("   📝 Criando tabela tecnicos...")
+        logger.info("   📝 Criando tabela tecnicos...")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS tecnicos (
                 id BIGSERIAL PRIMARY KEY,
@@ -352,7 +356,7 @@ class Migration(BaseMigration):
         # =============================================
         # ÍNDICES PARA PERFORMANCE
         # =============================================
-        print("   📝 Criando índices...")
+        logger.info("   📝 Criando índices...")
         
         # Índices de empresas
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_empresas_ativo ON empresas(ativo)")
@@ -403,7 +407,7 @@ class Migration(BaseMigration):
         # =============================================
         # TRIGGERS PARA UPDATED_AT
         # =============================================
-        print("   📝 Criando triggers para updated_at...")
+        logger.info("   📝 Criando triggers para updated_at...")
         
         # Função genérica para updated_at
         cursor.execute("""
@@ -431,12 +435,12 @@ class Migration(BaseMigration):
                     EXECUTE FUNCTION update_updated_at_column()
             """)
         
-        print("   ✅ Schema PostgreSQL completo!")
+        logger.info("   ✅ Schema PostgreSQL completo!")
     
     def _create_sqlite_schema(self, cursor):
         """Criar schema para SQLite (desenvolvimento local)"""
         
-        print("   📝 Criando schema SQLite...")
+        logger.info("   📝 Criando schema SQLite...")
         
         # Empresas
         cursor.execute("""
@@ -635,7 +639,7 @@ class Migration(BaseMigration):
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_manutencoes_veiculo ON manutencoes(veiculo_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_pecas_codigo ON pecas(codigo)")
         
-        print("   ✅ Schema SQLite completo!")
+        logger.info("   ✅ Schema SQLite completo!")
     
     def down(self):
         """Reverter migração - remover todas as tabelas"""
@@ -643,7 +647,7 @@ class Migration(BaseMigration):
         cursor = conn.cursor()
         
         try:
-            print("   ⚠️  Removendo todas as tabelas...")
+            logger.info("   ⚠️  Removendo todas as tabelas...")
             
             # Ordem inversa de criação (respeitar FKs)
             tables = [
@@ -670,11 +674,11 @@ class Migration(BaseMigration):
                 cursor.execute("DROP FUNCTION IF EXISTS update_updated_at_column() CASCADE")
             
             conn.commit()
-            print("   ✅ Todas as tabelas removidas!")
+            logger.info("   ✅ Todas as tabelas removidas!")
             
         except Exception as e:
             conn.rollback()
             raise Exception(f"Erro ao reverter schema: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
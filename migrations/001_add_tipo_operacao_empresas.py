@@ -14,8 +14,12 @@ REVERSÍVEL: Sim
 SEGURO PARA PRODUÇÃO: Sim (não quebra sistema existente)
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Adiciona tipo_operacao na tabela empresas"""
@@ -30,7 +34,7 @@ class Migration(BaseMigration):
         try:
             if self.is_postgres:
                 # PostgreSQL
-                print("   📝 Adicionando coluna tipo_operacao...")
+                logger.info("   📝 Adicionando coluna tipo_operacao...")
                 
                 # Verificar se coluna já existe
                 cursor.execute("""
@@ -65,13 +69,13 @@ class Migration(BaseMigration):
                         ON empresas(tipo_operacao)
                     """)
                     
-                    print("   ✅ Coluna tipo_operacao adicionada com sucesso")
+                    logger.info("   ✅ Coluna tipo_operacao adicionada com sucesso")
                 else:
-                    print("   ℹ️  Coluna tipo_operacao já existe")
+                    logger.info("   ℹ️  Coluna tipo_operacao já existe")
             
             else:
                 # SQLite
-                print("   📝 Adicionando coluna tipo_operacao (SQLite)...")
+                logger.info("   📝 Adicionando coluna tipo_operacao (SQLite)...")
                 
                 # Verificar se coluna já existe
                 cursor.execute("PRAGMA table_info(empresas)")
@@ -91,9 +95,9 @@ class Migration(BaseMigration):
                         ON empresas(tipo_operacao)
                     """)
                     
-                    print("   ✅ Coluna tipo_operacao adicionada com sucesso")
+                    logger.info("   ✅ Coluna tipo_operacao adicionada com sucesso")
                 else:
-                    print("   ℹ️  Coluna tipo_operacao já existe")
+                    logger.info("   ℹ️  Coluna tipo_operacao já existe")
             
             conn.commit()
             
@@ -102,7 +106,7 @@ class Migration(BaseMigration):
             raise Exception(f"Erro ao aplicar migração 001: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
     
     def down(self):
         """Reverter migração"""
@@ -111,7 +115,7 @@ class Migration(BaseMigration):
         
         try:
             if self.is_postgres:
-                print("   📝 Removendo coluna tipo_operacao...")
+                logger.info("   📝 Removendo coluna tipo_operacao...")
                 
                 # Remover constraint
                 cursor.execute("""
@@ -125,12 +129,12 @@ class Migration(BaseMigration):
                 # Remover coluna
                 cursor.execute("ALTER TABLE empresas DROP COLUMN IF EXISTS tipo_operacao")
                 
-                print("   ✅ Coluna tipo_operacao removida")
+                logger.info("   ✅ Coluna tipo_operacao removida")
             
             else:
                 # SQLite não suporta DROP COLUMN facilmente
-                print("   ⚠️  SQLite: não é possível remover coluna facilmente")
-                print("   ℹ️  Mantenha a coluna ou recrie a tabela manualmente")
+                logger.info("   ⚠️  SQLite: não é possível remover coluna facilmente")
+                logger.info("   ℹ️  Mantenha a coluna ou recrie a tabela manualmente")
             
             conn.commit()
             
@@ -139,4 +143,4 @@ class Migration(BaseMigration):
             raise Exception(f"Erro ao reverter migração 001: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
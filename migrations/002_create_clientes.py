@@ -14,8 +14,12 @@ REVERSÍVEL: Sim (DROP TABLE)
 SEGURO PARA PRODUÇÃO: Sim (tabela nova, não afeta sistema existente)
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Cria tabela clientes"""
@@ -30,7 +34,7 @@ class Migration(BaseMigration):
         try:
             if self.is_postgres:
                 # PostgreSQL
-                print("   📝 Criando tabela clientes...")
+                logger.info("   📝 Criando tabela clientes...")
                 
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS clientes (
@@ -95,11 +99,11 @@ class Migration(BaseMigration):
                         EXECUTE FUNCTION update_clientes_updated_at();
                 """)
                 
-                print("   ✅ Tabela clientes criada com sucesso")
+                logger.info("   ✅ Tabela clientes criada com sucesso")
             
             else:
                 # SQLite
-                print("   📝 Criando tabela clientes (SQLite)...")
+                logger.info("   📝 Criando tabela clientes (SQLite)...")
                 
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS clientes (
@@ -146,7 +150,7 @@ class Migration(BaseMigration):
                     END;
                 """)
                 
-                print("   ✅ Tabela clientes criada com sucesso")
+                logger.info("   ✅ Tabela clientes criada com sucesso")
             
             conn.commit()
             
@@ -155,7 +159,7 @@ class Migration(BaseMigration):
             raise Exception(f"Erro ao aplicar migração 002: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
     
     def down(self):
         """Reverter migração"""
@@ -163,7 +167,7 @@ class Migration(BaseMigration):
         cursor = conn.cursor()
         
         try:
-            print("   📝 Removendo tabela clientes...")
+            logger.info("   📝 Removendo tabela clientes...")
             
             if self.is_postgres:
                 # Remover trigger e function
@@ -174,11 +178,11 @@ class Migration(BaseMigration):
             cursor.execute("DROP TABLE IF EXISTS clientes CASCADE")
             
             conn.commit()
-            print("   ✅ Tabela clientes removida")
+            logger.info("   ✅ Tabela clientes removida")
             
         except Exception as e:
             conn.rollback()
             raise Exception(f"Erro ao reverter migração 002: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
@@ -14,8 +14,12 @@ REVERSÍVEL: Sim (DROP TABLE)
 SEGURO PARA PRODUÇÃO: Sim (tabela nova, não afeta sistema existente)
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Cria tabela servicos"""
@@ -30,7 +34,7 @@ class Migration(BaseMigration):
         try:
             if self.is_postgres:
                 # PostgreSQL
-                print("   📝 Criando tabela servicos...")
+                logger.info("   📝 Criando tabela servicos...")
                 
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS servicos (
@@ -87,11 +91,11 @@ class Migration(BaseMigration):
                         EXECUTE FUNCTION update_servicos_updated_at();
                 """)
                 
-                print("   ✅ Tabela servicos criada com sucesso")
+                logger.info("   ✅ Tabela servicos criada com sucesso")
             
             else:
                 # SQLite
-                print("   📝 Criando tabela servicos (SQLite)...")
+                logger.info("   📝 Criando tabela servicos (SQLite)...")
                 
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS servicos (
@@ -132,7 +136,7 @@ class Migration(BaseMigration):
                     END;
                 """)
                 
-                print("   ✅ Tabela servicos criada com sucesso")
+                logger.info("   ✅ Tabela servicos criada com sucesso")
             
             conn.commit()
             
@@ -141,7 +145,7 @@ class Migration(BaseMigration):
             raise Exception(f"Erro ao aplicar migração 003: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
     
     def down(self):
         """Reverter migração"""
@@ -149,7 +153,7 @@ class Migration(BaseMigration):
         cursor = conn.cursor()
         
         try:
-            print("   📝 Removendo tabela servicos...")
+            logger.info("   📝 Removendo tabela servicos...")
             
             if self.is_postgres:
                 # Remover trigger e function
@@ -160,11 +164,11 @@ class Migration(BaseMigration):
             cursor.execute("DROP TABLE IF EXISTS servicos CASCADE")
             
             conn.commit()
-            print("   ✅ Tabela servicos removida")
+            logger.info("   ✅ Tabela servicos removida")
             
         except Exception as e:
             conn.rollback()
             raise Exception(f"Erro ao reverter migração 003: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
@@ -14,8 +14,12 @@ REVERSÍVEL: Sim (DROP COLUMN no PostgreSQL)
 SEGURO PARA PRODUÇÃO: Sim (coluna nullable, não quebra sistema existente)
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Adiciona cliente_id na tabela veiculos"""
@@ -30,7 +34,7 @@ class Migration(BaseMigration):
         try:
             if self.is_postgres:
                 # PostgreSQL
-                print("   📝 Adicionando coluna cliente_id em veiculos...")
+                logger.info("   📝 Adicionando coluna cliente_id em veiculos...")
                 
                 # Verificar se coluna já existe
                 cursor.execute("""
@@ -67,13 +71,13 @@ class Migration(BaseMigration):
                         ON veiculos(empresa_id, cliente_id)
                     """)
                     
-                    print("   ✅ Coluna cliente_id adicionada com sucesso")
+                    logger.info("   ✅ Coluna cliente_id adicionada com sucesso")
                 else:
-                    print("   ℹ️  Coluna cliente_id já existe")
+                    logger.info("   ℹ️  Coluna cliente_id já existe")
             
             else:
                 # SQLite
-                print("   📝 Adicionando coluna cliente_id em veiculos (SQLite)...")
+                logger.info("   📝 Adicionando coluna cliente_id em veiculos (SQLite)...")
                 
                 # Verificar se coluna já existe
                 cursor.execute("PRAGMA table_info(veiculos)")
@@ -98,9 +102,9 @@ class Migration(BaseMigration):
                         ON veiculos(empresa_id, cliente_id)
                     """)
                     
-                    print("   ✅ Coluna cliente_id adicionada com sucesso")
+                    logger.info("   ✅ Coluna cliente_id adicionada com sucesso")
                 else:
-                    print("   ℹ️  Coluna cliente_id já existe")
+                    logger.info("   ℹ️  Coluna cliente_id já existe")
             
             conn.commit()
             
@@ -109,7 +113,7 @@ class Migration(BaseMigration):
             raise Exception(f"Erro ao aplicar migração 004: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
     
     def down(self):
         """Reverter migração"""
@@ -118,7 +122,7 @@ class Migration(BaseMigration):
         
         try:
             if self.is_postgres:
-                print("   📝 Removendo coluna cliente_id de veiculos...")
+                logger.info("   📝 Removendo coluna cliente_id de veiculos...")
                 
                 # Remover índices
                 cursor.execute("DROP INDEX IF EXISTS idx_veiculos_cliente_id")
@@ -133,12 +137,12 @@ class Migration(BaseMigration):
                 # Remover coluna
                 cursor.execute("ALTER TABLE veiculos DROP COLUMN IF EXISTS cliente_id")
                 
-                print("   ✅ Coluna cliente_id removida")
+                logger.info("   ✅ Coluna cliente_id removida")
             
             else:
                 # SQLite não suporta DROP COLUMN facilmente
-                print("   ⚠️  SQLite: não é possível remover coluna facilmente")
-                print("   ℹ️  Mantenha a coluna ou recrie a tabela manualmente")
+                logger.info("   ⚠️  SQLite: não é possível remover coluna facilmente")
+                logger.info("   ℹ️  Mantenha a coluna ou recrie a tabela manualmente")
             
             conn.commit()
             
@@ -147,4 +151,4 @@ class Migration(BaseMigration):
             raise Exception(f"Erro ao reverter migração 004: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
@@ -10,12 +10,248 @@ MUDANÇAS:
 - FK para empresas, clientes e manutenções
 - Multi-tenancy via empresa_id
 
+NOTA: o trigger generate_numero_os é removido pela migração 016; numero_os
+passa a ser gerado pelo app (proximo_numero_os, sequence por empresa). O
+down() também remove as sequences ordens_servico_seq_<empresa_id> criadas
+pelo app.
+
+NOTA: valores monetários ficam em DECIMAL(10,2) (reais). Migrar para BIGINT
+em centavos exige converter todas as leituras/escritas do app, os dados já
+existentes e manutencoes.valor_total_servicos na mesma entrega.
+
 REVERSÍVEL: Sim (DROP TABLE)
 SEGURO PARA PRODUÇÃO: Sim (tabela nova, não afeta sistema existente)
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
+
+# DDL por backend, montada uma vez no import
+_PG_DDL = (
+    """
+        CREATE TABLE IF NOT EXISTS ordens_servico (
+            id BIGSERIAL PRIMARY KEY,
+            empresa_id BIGINT NOT NULL,
+            manutencao_id BIGINT NOT NULL,
+            cliente_id BIGINT NOT NULL,
+            numero_os VARCHAR(50) UNIQUE NOT NULL,
+            status VARCHAR(20) DEFAULT 'ORCAMENTO' 
+                CHECK(status IN ('RASCUNHO', 'ORCAMENTO', 'APROVADO', 
+                               'EM_EXECUCAO', 'FINALIZADO', 'FATURADO', 'CANCELADO')),
+            valor_mao_obra DECIMAL(10,2) DEFAULT 0.00 CHECK(valor_mao_obra >= 0),
+            valor_pecas DECIMAL(10,2) DEFAULT 0.00 CHECK(valor_pecas >= 0),
+            valor_servicos DECIMAL(10,2) DEFAULT 0.00 CHECK(valor_servicos >= 0),
+            valor_total DECIMAL(10,2) GENERATED ALWAYS AS 
+                (valor_mao_obra + valor_pecas + valor_servicos) STORED,
+            data_abertura TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            data_aprovacao TIMESTAMP WITH TIME ZONE,
+            data_conclusao TIMESTAMP WITH TIME ZONE,
+            data_faturamento TIMESTAMP WITH TIME ZONE,
+            observacoes TEXT,
+            observacoes_internas TEXT,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+
+            CONSTRAINT fk_ordens_servico_empresa 
+                FOREIGN KEY (empresa_id) 
+                REFERENCES empresas(id) 
+                ON DELETE RESTRICT,
+
+            CONSTRAINT fk_ordens_servico_manutencao 
+                FOREIGN KEY (manutencao_id) 
+                REFERENCES manutencoes(id) 
+                ON DELETE RESTRICT,
+
+            CONSTRAINT fk_ordens_servico_cliente 
+                FOREIGN KEY (cliente_id) 
+                REFERENCES clientes(id) 
+                ON DELETE RESTRICT
+        )
+    """,
+
+    # Trigger para validar que cliente pertence à mesma empresa
+    """
+        CREATE OR REPLACE FUNCTION validate_ordens_servico_empresa()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            cliente_empresa_id BIGINT;
+        BEGIN
+            SELECT empresa_id INTO cliente_empresa_id 
+            FROM clientes WHERE id = NEW.cliente_id;
+
+            IF cliente_empresa_id IS NULL THEN
+                RAISE EXCEPTION 'Cliente não encontrado: %', NEW.cliente_id;
+            END IF;
+
+            IF cliente_empresa_id != NEW.empresa_id THEN
+                RAISE EXCEPTION 'Cliente % não pertence à empresa %', 
+                    NEW.cliente_id, NEW.empresa_id;
+            END IF;
+
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+
+    """
+        DROP TRIGGER IF EXISTS trigger_validate_ordens_servico_empresa ON ordens_servico;
+        CREATE TRIGGER trigger_validate_ordens_servico_empresa
+            BEFORE INSERT OR UPDATE ON ordens_servico
+            FOR EACH ROW
+            EXECUTE FUNCTION validate_ordens_servico_empresa();
+    """,
+
+    # Criar índices
+    """
+        CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_id 
+        ON ordens_servico(empresa_id)
+    """,
+
+    """
+        CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_status 
+        ON ordens_servico(empresa_id, status)
+    """,
+
+    """
+        CREATE INDEX IF NOT EXISTS idx_ordens_servico_cliente 
+        ON ordens_servico(cliente_id)
+    """,
+
+    """
+        CREATE INDEX IF NOT EXISTS idx_ordens_servico_manutencao 
+        ON ordens_servico(manutencao_id)
+    """,
+
+    """
+        CREATE INDEX IF NOT EXISTS idx_ordens_servico_numero 
+        ON ordens_servico(numero_os)
+    """,
+
+    """
+        CREATE INDEX IF NOT EXISTS idx_ordens_servico_data_abertura 
+        ON ordens_servico(empresa_id, data_abertura DESC)
+    """,
+
+    # Criar trigger para updated_at
+    """
+        CREATE OR REPLACE FUNCTION update_ordens_servico_updated_at()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at = CURRENT_TIMESTAMP;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+
+    """
+        DROP TRIGGER IF EXISTS trigger_ordens_servico_updated_at ON ordens_servico;
+        CREATE TRIGGER trigger_ordens_servico_updated_at
+            BEFORE UPDATE ON ordens_servico
+            FOR EACH ROW
+            EXECUTE FUNCTION update_ordens_servico_updated_at();
+    """,
+
+    # Criar função para gerar número de OS automaticamente
+    """
+        CREATE OR REPLACE FUNCTION generate_numero_os()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            next_number INTEGER;
+            ano_atual VARCHAR(4);
+        BEGIN
+            IF NEW.numero_os IS NULL OR NEW.numero_os = '' THEN
+                ano_atual := TO_CHAR(CURRENT_DATE, 'YYYY');
+
+                SELECT COALESCE(MAX(
+                    CAST(
+                        SUBSTRING(numero_os FROM POSITION('-' IN numero_os) + 1 FOR 
+                        POSITION('/' IN numero_os) - POSITION('-' IN numero_os) - 1)
+                    AS INTEGER)
+                ), 0) + 1
+                INTO next_number
+                FROM ordens_servico
+                WHERE empresa_id = NEW.empresa_id 
+                AND numero_os LIKE 'OS-%/' || ano_atual;
+
+                NEW.numero_os := 'OS-' || LPAD(next_number::TEXT, 6, '0') || '/' || ano_atual;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+
+    """
+        DROP TRIGGER IF EXISTS trigger_generate_numero_os ON ordens_servico;
+        CREATE TRIGGER trigger_generate_numero_os
+            BEFORE INSERT ON ordens_servico
+            FOR EACH ROW
+            EXECUTE FUNCTION generate_numero_os();
+    """,
+)
+
+_SQLITE_DDL = (
+    # Valores monetários seguem em REAL (reais, não centavos): o app
+    # compartilha o SQL com o PostgreSQL e lê essas colunas sem escala.
+    """
+        CREATE TABLE IF NOT EXISTS ordens_servico (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            empresa_id INTEGER NOT NULL,
+            manutencao_id INTEGER NOT NULL,
+            cliente_id INTEGER NOT NULL,
+            numero_os TEXT UNIQUE NOT NULL,
+            status TEXT DEFAULT 'ORCAMENTO' 
+                CHECK(status IN ('RASCUNHO', 'ORCAMENTO', 'APROVADO', 
+                               'EM_EXECUCAO', 'FINALIZADO', 'FATURADO', 'CANCELADO')),
+            valor_mao_obra REAL DEFAULT 0.00 CHECK(valor_mao_obra >= 0),
+            valor_pecas REAL DEFAULT 0.00 CHECK(valor_pecas >= 0),
+            valor_servicos REAL DEFAULT 0.00 CHECK(valor_servicos >= 0),
+            valor_total REAL GENERATED ALWAYS AS 
+                (valor_mao_obra + valor_pecas + valor_servicos) VIRTUAL,
+            data_abertura TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            data_aprovacao TIMESTAMP,
+            data_conclusao TIMESTAMP,
+            data_faturamento TIMESTAMP,
+            observacoes TEXT,
+            observacoes_internas TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+            FOREIGN KEY (empresa_id) REFERENCES empresas(id),
+            FOREIGN KEY (manutencao_id) REFERENCES manutencoes(id),
+            FOREIGN KEY (cliente_id) REFERENCES clientes(id)
+        )
+    """,
+
+    # Criar índices
+    """
+        CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_id 
+        ON ordens_servico(empresa_id)
+    """,
+
+    """
+        CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_status 
+        ON ordens_servico(empresa_id, status)
+    """,
+
+    """
+        CREATE INDEX IF NOT EXISTS idx_ordens_servico_cliente 
+        ON ordens_servico(cliente_id)
+    """,
+
+    """
+        CREATE INDEX IF NOT EXISTS idx_ordens_servico_manutencao 
+        ON ordens_servico(manutencao_id)
+    """,
+
+    # Sem trigger AFTER UPDATE para updated_at (gerava um segundo
+    # UPDATE por linha); os UPDATEs do app já setam
+    # updated_at = CURRENT_TIMESTAMP explicitamente.
+)
+
 
 class Migration(BaseMigration):
     """Cria tabela ordens_servico"""
@@ -30,237 +266,17 @@ class Migration(BaseMigration):
         try:
             if self.is_postgres:
                 # PostgreSQL
-                print("   📝 Criando tabela ordens_servico...")
-                
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS ordens_servico (
-                        id BIGSERIAL PRIMARY KEY,
-                        empresa_id BIGINT NOT NULL,
-                        manutencao_id BIGINT NOT NULL,
-                        cliente_id BIGINT NOT NULL,
-                        numero_os VARCHAR(50) UNIQUE NOT NULL,
-                        status VARCHAR(20) DEFAULT 'ORCAMENTO' 
-                            CHECK(status IN ('RASCUNHO', 'ORCAMENTO', 'APROVADO', 
-                                           'EM_EXECUCAO', 'FINALIZADO', 'FATURADO', 'CANCELADO')),
-                        valor_mao_obra DECIMAL(10,2) DEFAULT 0.00 CHECK(valor_mao_obra >= 0),
-                        valor_pecas DECIMAL(10,2) DEFAULT 0.00 CHECK(valor_pecas >= 0),
-                        valor_servicos DECIMAL(10,2) DEFAULT 0.00 CHECK(valor_servicos >= 0),
-                        valor_total DECIMAL(10,2) GENERATED ALWAYS AS 
-                            (valor_mao_obra + valor_pecas + valor_servicos) STORED,
-                        data_abertura TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                        data_aprovacao TIMESTAMP WITH TIME ZONE,
-                        data_conclusao TIMESTAMP WITH TIME ZONE,
-                        data_faturamento TIMESTAMP WITH TIME ZONE,
-                        observacoes TEXT,
-                        observacoes_internas TEXT,
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                        
-                        CONSTRAINT fk_ordens_servico_empresa 
-                            FOREIGN KEY (empresa_id) 
-                            REFERENCES empresas(id) 
-                            ON DELETE RESTRICT,
-                        
-                        CONSTRAINT fk_ordens_servico_manutencao 
-                            FOREIGN KEY (manutencao_id) 
-                            REFERENCES manutencoes(id) 
-                            ON DELETE RESTRICT,
-                        
-                        CONSTRAINT fk_ordens_servico_cliente 
-                            FOREIGN KEY (cliente_id) 
-                            REFERENCES clientes(id) 
-                            ON DELETE RESTRICT
-                    )
-                """)
-                
-                # Trigger para validar que cliente pertence à mesma empresa
-                cursor.execute("""
-                    CREATE OR REPLACE FUNCTION validate_ordens_servico_empresa()
-                    RETURNS TRIGGER AS $$
-                    DECLARE
-                        cliente_empresa_id BIGINT;
-                    BEGIN
-                        SELECT empresa_id INTO cliente_empresa_id 
-                        FROM clientes WHERE id = NEW.cliente_id;
-                        
-                        IF cliente_empresa_id IS NULL THEN
-                            RAISE EXCEPTION 'Cliente não encontrado: %', NEW.cliente_id;
-                        END IF;
-                        
-                        IF cliente_empresa_id != NEW.empresa_id THEN
-                            RAISE EXCEPTION 'Cliente % não pertence à empresa %', 
-                                NEW.cliente_id, NEW.empresa_id;
-                        END IF;
-                        
-                        RETURN NEW;
-                    END;
-                    $$ LANGUAGE plpgsql;
-                """)
-                
-                cursor.execute("""
-                    DROP TRIGGER IF EXISTS trigger_validate_ordens_servico_empresa ON ordens_servico;
-                    CREATE TRIGGER trigger_validate_ordens_servico_empresa
-                        BEFORE INSERT OR UPDATE ON ordens_servico
-                        FOR EACH ROW
-                        EXECUTE FUNCTION validate_ordens_servico_empresa();
-                """)
-                
-                # Criar índices
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_id 
-                    ON ordens_servico(empresa_id)
-                """)
-                
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_status 
-                    ON ordens_servico(empresa_id, status)
-                """)
-                
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_ordens_servico_cliente 
-                    ON ordens_servico(cliente_id)
-                """)
-                
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_ordens_servico_manutencao 
-                    ON ordens_servico(manutencao_id)
-                """)
-                
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_ordens_servico_numero 
-                    ON ordens_servico(numero_os)
-                """)
-                
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_ordens_servico_data_abertura 
-                    ON ordens_servico(empresa_id, data_abertura DESC)
-                """)
-                
-                # Criar trigger para updated_at
-                cursor.execute("""
-                    CREATE OR REPLACE FUNCTION update_ordens_servico_updated_at()
-                    RETURNS TRIGGER AS $$
-                    BEGIN
-                        NEW.updated_at = CURRENT_TIMESTAMP;
-                        RETURN NEW;
-                    END;
-                    $$ LANGUAGE plpgsql;
-                """)
-                
-                cursor.execute("""
-                    DROP TRIGGER IF EXISTS trigger_ordens_servico_updated_at ON ordens_servico;
-                    CREATE TRIGGER trigger_ordens_servico_updated_at
-                        BEFORE UPDATE ON ordens_servico
-                        FOR EACH ROW
-                        EXECUTE FUNCTION update_ordens_servico_updated_at();
-                """)
-                
-                # Criar função para gerar número de OS automaticamente
-                cursor.execute("""
-                    CREATE OR REPLACE FUNCTION generate_numero_os()
-                    RETURNS TRIGGER AS $$
-                    DECLARE
-                        next_number INTEGER;
-                        ano_atual VARCHAR(4);
-                    BEGIN
-                        IF NEW.numero_os IS NULL OR NEW.numero_os = '' THEN
-                            ano_atual := TO_CHAR(CURRENT_DATE, 'YYYY');
-                            
-                            SELECT COALESCE(MAX(
-                                CAST(
-                                    SUBSTRING(numero_os FROM POSITION('-' IN numero_os) + 1 FOR 
-                                    POSITION('/' IN numero_os) - POSITION('-' IN numero_os) - 1)
-                                AS INTEGER)
-                            ), 0) + 1
-                            INTO next_number
-                            FROM ordens_servico
-                            WHERE empresa_id = NEW.empresa_id 
-                            AND numero_os LIKE 'OS-%/' || ano_atual;
-                            
-                            NEW.numero_os := 'OS-' || LPAD(next_number::TEXT, 6, '0') || '/' || ano_atual;
-                        END IF;
-                        RETURN NEW;
-                    END;
-                    $$ LANGUAGE plpgsql;
-                """)
-                
-                cursor.execute("""
-                    DROP TRIGGER IF EXISTS trigger_generate_numero_os ON ordens_servico;
-                    CREATE TRIGGER trigger_generate_numero_os
-                        BEFORE INSERT ON ordens_servico
-                        FOR EACH ROW
-                        EXECUTE FUNCTION generate_numero_os();
-                """)
-                
-                print("   ✅ Tabela ordens_servico criada com sucesso")
-            
+                logger.info("   📝 Criando tabela ordens_servico...")
+                ddl = _PG_DDL
             else:
                 # SQLite
-                print("   📝 Criando tabela ordens_servico (SQLite)...")
-                
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS ordens_servico (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        empresa_id INTEGER NOT NULL,
-                        manutencao_id INTEGER NOT NULL,
-                        cliente_id INTEGER NOT NULL,
-                        numero_os TEXT UNIQUE NOT NULL,
-                        status TEXT DEFAULT 'ORCAMENTO' 
-                            CHECK(status IN ('RASCUNHO', 'ORCAMENTO', 'APROVADO', 
-                                           'EM_EXECUCAO', 'FINALIZADO', 'FATURADO', 'CANCELADO')),
-                        valor_mao_obra REAL DEFAULT 0.00 CHECK(valor_mao_obra >= 0),
-                        valor_pecas REAL DEFAULT 0.00 CHECK(valor_pecas >= 0),
-                        valor_servicos REAL DEFAULT 0.00 CHECK(valor_servicos >= 0),
-                        valor_total REAL GENERATED ALWAYS AS 
-                            (valor_mao_obra + valor_pecas + valor_servicos) STORED,
-                        data_abertura TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        data_aprovacao TIMESTAMP,
-                        data_conclusao TIMESTAMP,
-                        data_faturamento TIMESTAMP,
-                        observacoes TEXT,
-                        observacoes_internas TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        
-                        FOREIGN KEY (empresa_id) REFERENCES empresas(id),
-                        FOREIGN KEY (manutencao_id) REFERENCES manutencoes(id),
-                        FOREIGN KEY (cliente_id) REFERENCES clientes(id)
-                    )
-                """)
-                
-                # Criar índices
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_id 
-                    ON ordens_servico(empresa_id)
-                """)
-                
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_status 
-                    ON ordens_servico(empresa_id, status)
-                """)
-                
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_ordens_servico_cliente 
-                    ON ordens_servico(cliente_id)
-                """)
-                
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_ordens_servico_manutencao 
-                    ON ordens_servico(manutencao_id)
-                """)
-                
-                # Trigger para updated_at
-                cursor.execute("""
-                    CREATE TRIGGER IF NOT EXISTS trigger_ordens_servico_updated_at
-                    AFTER UPDATE ON ordens_servico
-                    FOR EACH ROW
-                    BEGIN
-                        UPDATE ordens_servico SET updated_at = CURRENT_TIMESTAMP
-                        WHERE id = NEW.id;
-                    END;
-                """)
-                
-                print("   ✅ Tabela ordens_servico criada com sucesso")
+                logger.info("   📝 Criando tabela ordens_servico (SQLite)...")
+                ddl = _SQLITE_DDL
+            
+            for statement in ddl:
+                cursor.execute(statement)
+            
+            logger.info("   ✅ Tabela ordens_servico criada com sucesso")
             
             conn.commit()
             
@@ -269,7 +285,7 @@ class Migration(BaseMigration):
             raise Exception(f"Erro ao aplicar migração 006: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
     
     def down(self):
         """Reverter migração"""
@@ -277,7 +293,7 @@ class Migration(BaseMigration):
         cursor = conn.cursor()
         
         try:
-            print("   📝 Removendo tabela ordens_servico...")
+            logger.info("   📝 Removendo tabela ordens_servico...")
             
             if self.is_postgres:
                 # Remover triggers e functions
@@ -285,16 +301,28 @@ class Migration(BaseMigration):
                 cursor.execute("DROP TRIGGER IF EXISTS trigger_generate_numero_os ON ordens_servico")
                 cursor.execute("DROP FUNCTION IF EXISTS update_ordens_servico_updated_at()")
                 cursor.execute("DROP FUNCTION IF EXISTS generate_numero_os()")
+                
+                # Sequences de numero_os por empresa (criadas pelo app)
+                cursor.execute("""
+                    SELECT relname FROM pg_class 
+                    WHERE relkind = 'S' AND relnamespace = current_schema()::regnamespace 
+                    AND relname ~ '^ordens_servico_seq_[0-9]+$'
+                """)
+                sequences = [row[0] for row in cursor.fetchall()]
+                if sequences:
+                    cursor.execute(f"DROP SEQUENCE IF EXISTS {', '.join(sequences)}")
             
-            # Remover tabela
-            cursor.execute("DROP TABLE IF EXISTS ordens_servico CASCADE")
+            # Remover tabela (sem CASCADE: nenhuma tabela referencia
+            # ordens_servico; novas dependências devem ser removidas
+            # antes, na migração que as criou)
+            cursor.execute("DROP TABLE IF EXISTS ordens_servico")
             
             conn.commit()
-            print("   ✅ Tabela ordens_servico removida")
+            logger.info("   ✅ Tabela ordens_servico removida")
             
         except Exception as e:
             conn.rollback()
             raise Exception(f"Erro ao reverter migração 006: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
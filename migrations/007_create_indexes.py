@@ -13,21 +13,38 @@ REVERSÍVEL: Sim (DROP INDEX)
 SEGURO PARA PRODUÇÃO: Sim (apenas índices, não altera dados)
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Cria índices de performance para multi-tenancy"""
     
     name = "Criar índices de performance multi-tenancy"
     
+    # (tabela, coluna) de que dependem os índices opcionais
+    COLUNAS_OPCIONAIS = (
+        ('pecas', 'ativo'),
+        ('fornecedores', 'ativo'),
+        ('tecnicos', 'status'),
+        ('usuarios', 'ativo'),
+        ('usuarios', 'role'),
+        ('financeiro_entradas', 'data_entrada'),
+        ('financeiro_despesas', 'data_despesa'),
+        ('empresas', 'ativo'),
+        ('empresas', 'tipo_operacao'),
+    )
+    
     def up(self):
         """Aplicar migração"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         try:
-            print("   📝 Criando índices de performance...")
+            logger.info("   📝 Criando índices de performance...")
             
             # Índices para tabela veiculos
             cursor.execute("""
@@ -59,25 +76,15 @@ class Migration(BaseMigration):
                 ON manutencoes(empresa_id, veiculo_id)
             """)
             
-            # Índices para tabela pecas (verifica se tem coluna ativo)
-            try:
-                if self.is_postgres:
-                    cursor.execute("""
-                        SELECT column_name FROM information_schema.columns 
-                        WHERE table_name='pecas' AND column_name='ativo'
-                    """)
-                else:
-                    cursor.execute("PRAGMA table_info(pecas)")
-                    columns = [col[1] for col in cursor.fetchall()]
-                    has_ativo = 'ativo' in columns
-                
-                if self.is_postgres and cursor.fetchone() or not self.is_postgres and has_ativo:
-                    cursor.execute("""
-                        CREATE INDEX IF NOT EXISTS idx_pecas_empresa_ativo 
-                        ON pecas(empresa_id, ativo)
-                    """)
-            except:
-                pass  # Coluna ativo pode não existir
+            # Índices opcionais: dependem de tabelas/colunas que podem não existir.
+            # Uma única consulta ao catálogo decide quais criar.
+            existentes = self._colunas_existentes(cursor)
+            
+            if ('pecas', 'ativo') in existentes:
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_pecas_empresa_ativo 
+                    ON pecas(empresa_id, ativo)
+                """)
             
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_pecas_empresa_codigo 
@@ -85,64 +92,34 @@ class Migration(BaseMigration):
             """)
             
             # Índices para tabela fornecedores
-            try:
-                if self.is_postgres:
-                    cursor.execute("""
-                        SELECT column_name FROM information_schema.columns 
-                        WHERE table_name='fornecedores' AND column_name='ativo'
-                    """)
-                else:
-                    cursor.execute("PRAGMA table_info(fornecedores)")
-                    columns = [col[1] for col in cursor.fetchall()]
-                    has_ativo = 'ativo' in columns
-                
-                if self.is_postgres and cursor.fetchone() or not self.is_postgres and has_ativo:
-                    cursor.execute("""
-                        CREATE INDEX IF NOT EXISTS idx_fornecedores_empresa_ativo 
-                        ON fornecedores(empresa_id, ativo)
-                    """)
-            except:
-                pass
+            if ('fornecedores', 'ativo') in existentes:
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_fornecedores_empresa_ativo 
+                    ON fornecedores(empresa_id, ativo)
+                """)
             
             # Índices para tabela tecnicos (se existir)
-            try:
+            if ('tecnicos', 'status') in existentes:
                 cursor.execute("""
                     CREATE INDEX IF NOT EXISTS idx_tecnicos_empresa_status 
                     ON tecnicos(empresa_id, status)
                 """)
-            except:
-                pass  # Tabela pode não existir
             
             # Índices para tabela usuarios
-            try:
-                if self.is_postgres:
-                    cursor.execute("""
-                        SELECT column_name FROM information_schema.columns 
-                        WHERE table_name='usuarios' AND column_name='ativo'
-                    """)
-                else:
-                    cursor.execute("PRAGMA table_info(usuarios)")
-                    columns = [col[1] for col in cursor.fetchall()]
-                    has_ativo = 'ativo' in columns
-                
-                if self.is_postgres and cursor.fetchone() or not self.is_postgres and has_ativo:
-                    cursor.execute("""
-                        CREATE INDEX IF NOT EXISTS idx_usuarios_empresa_ativo 
-                        ON usuarios(empresa_id, ativo)
-                    """)
-            except:
-                pass
-            
-            try:
+            if ('usuarios', 'ativo') in existentes:
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_usuarios_empresa_ativo 
+                    ON usuarios(empresa_id, ativo)
+                """)
+            
+            if ('usuarios', 'role') in existentes:
                 cursor.execute("""
                     CREATE INDEX IF NOT EXISTS idx_usuarios_empresa_role 
                     ON usuarios(empresa_id, role)
                 """)
-            except:
-                pass
             
             # Índices para tabelas financeiras (se existirem)
-            try:
+            if ('financeiro_entradas', 'data_entrada') in existentes:
                 cursor.execute("""
                     CREATE INDEX IF NOT EXISTS idx_financeiro_entradas_empresa_data 
                     ON financeiro_entradas(empresa_id, data_entrada DESC)
@@ -150,10 +127,8 @@ class Migration(BaseMigration):
                     CREATE INDEX IF NOT EXISTS idx_financeiro_entradas_empresa_data 
                     ON financeiro_entradas(empresa_id, data_entrada)
                 """)
-            except:
-                pass
             
-            try:
+            if ('financeiro_despesas', 'data_despesa') in existentes:
                 cursor.execute("""
                     CREATE INDEX IF NOT EXISTS idx_financeiro_despesas_empresa_data 
                     ON financeiro_despesas(empresa_id, data_despesa DESC)
@@ -161,11 +136,9 @@ class Migration(BaseMigration):
                     CREATE INDEX IF NOT EXISTS idx_financeiro_despesas_empresa_data 
                     ON financeiro_despesas(empresa_id, data_despesa)
                 """)
-            except:
-                pass
             
             # Índice específico para busca por tipo de empresa
-            try:
+            if ('empresas', 'ativo') in existentes and ('empresas', 'tipo_operacao') in existentes:
                 cursor.execute("""
                     CREATE INDEX IF NOT EXISTS idx_empresas_ativo_tipo 
                     ON empresas(ativo, tipo_operacao) 
@@ -174,18 +147,32 @@ class Migration(BaseMigration):
                     CREATE INDEX IF NOT EXISTS idx_empresas_ativo_tipo 
                     ON empresas(ativo, tipo_operacao)
                 """)
-            except:
-                pass
             
             conn.commit()
-            print("   ✅ Índices de performance criados com sucesso")
+            logger.info("   ✅ Índices de performance criados com sucesso")
             
         except Exception as e:
             conn.rollback()
             raise Exception(f"Erro ao aplicar migração 007: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
+    
+    def _colunas_existentes(self, cursor):
+        """Retorna o conjunto de (tabela, coluna) opcionais presentes no banco"""
+        if self.is_postgres:
+            cursor.execute("""
+                SELECT table_name, column_name FROM information_schema.columns 
+                WHERE (table_name, column_name) IN %s
+            """, (self.COLUNAS_OPCIONAIS,))
+        else:
+            cursor.execute("""
+                SELECT m.name, p.name 
+                FROM sqlite_master m, pragma_table_info(m.name) p 
+                WHERE m.type = 'table'
+            """)
+        
+        return {(row[0], row[1]) for row in cursor.fetchall()} & set(self.COLUNAS_OPCIONAIS)
     
     def down(self):
         """Reverter migração"""
@@ -193,7 +180,7 @@ class Migration(BaseMigration):
         cursor = conn.cursor()
         
         try:
-            print("   📝 Removendo índices de performance...")
+            logger.info("   📝 Removendo índices de performance...")
             
             indices = [
                 'idx_veiculos_empresa_status',
@@ -204,7 +191,7 @@ class Migration(BaseMigration):
                 'idx_pecas_empresa_ativo',
                 'idx_pecas_empresa_codigo',
                 'idx_fornecedores_empresa_ativo',
-                'idx_tecnicos_empresa_ativo',
+                'idx_tecnicos_empresa_status',
                 'idx_usuarios_empresa_ativo',
                 'idx_usuarios_empresa_role',
                 'idx_financeiro_entradas_empresa_data',
@@ -212,18 +199,19 @@ class Migration(BaseMigration):
                 'idx_empresas_ativo_tipo'
             ]
             
-            for idx in indices:
-                try:
-                    cursor.execute(f"DROP INDEX IF EXISTS {idx}")
-                except:
-                    pass  # Índice pode não existir
+            # IF EXISTS já cobre índices opcionais que não foram criados
+            if self.is_postgres:
+                cursor.execute("DROP INDEX IF EXISTS " + ", ".join(indices))
+            else:
+                # SQLite aceita apenas um índice por DROP INDEX
+                cursor.executescript("\n".join(f"DROP INDEX IF EXISTS {idx};" for idx in indices))
             
             conn.commit()
-            print("   ✅ Índices removidos")
+            logger.info("   ✅ Índices removidos")
             
         except Exception as e:
             conn.rollback()
             raise Exception(f"Erro ao reverter migração 007: {e}")
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
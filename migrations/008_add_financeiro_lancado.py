@@ -9,12 +9,20 @@ MUDANÇAS:
 - Campo indica data/hora do lançamento financeiro
 - NULL = ainda não lançado (permite verificação de idempotência)
 
+REQUISITO: PostgreSQL 12+ (o mesmo da migração 006, que usa colunas
+GENERATED). O ADD COLUMN ... DEFAULT constante só altera o catálogo, sem
+reescrever manutencoes.
+
 REVERSÍVEL: Sim (DROP COLUMN)
 SEGURO PARA PRODUÇÃO: Sim (ADD COLUMN nullable)
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Adiciona campo para controle de lançamento financeiro"""
@@ -29,86 +37,63 @@ class Migration(BaseMigration):
         try:
             if self.is_postgres:
                 # PostgreSQL
-                print("   📝 Verificando se coluna financeiro_lancado_em existe...")
-                
-                cursor.execute("""
-                    SELECT column_name FROM information_schema.columns 
-                    WHERE table_name = 'manutencoes' AND column_name = 'financeiro_lancado_em'
-                """)
-                
-                if cursor.fetchone():
-                    print("   ⚠️ Coluna financeiro_lancado_em já existe. Pulando...")
-                else:
-                    print("   📝 Adicionando coluna financeiro_lancado_em...")
-                    cursor.execute("""
-                        ALTER TABLE manutencoes 
-                        ADD COLUMN financeiro_lancado_em TIMESTAMP WITH TIME ZONE DEFAULT NULL
-                    """)
-                    print("   ✅ Coluna adicionada com sucesso!")
-                
-                # Adicionar também tipo_lancamento para saber se foi ENTRADA ou DESPESA
-                cursor.execute("""
-                    SELECT column_name FROM information_schema.columns 
-                    WHERE table_name = 'manutencoes' AND column_name = 'financeiro_tipo'
-                """)
+                logger.info("   📝 Verificando colunas financeiras em manutencoes...")
                 
-                if cursor.fetchone():
-                    print("   ⚠️ Coluna financeiro_tipo já existe. Pulando...")
-                else:
-                    print("   📝 Adicionando coluna financeiro_tipo...")
-                    cursor.execute("""
-                        ALTER TABLE manutencoes 
-                        ADD COLUMN financeiro_tipo VARCHAR(20) DEFAULT NULL
-                        CHECK (financeiro_tipo IN ('ENTRADA', 'DESPESA', NULL))
-                    """)
-                    print("   ✅ Coluna financeiro_tipo adicionada!")
+                # financeiro_tipo: se o lançamento foi ENTRADA ou DESPESA
+                # valor_total_servicos: soma dos serviços (SERVICO)
+                colunas = [
+                    ("financeiro_lancado_em", "TIMESTAMP WITH TIME ZONE DEFAULT NULL"),
+                    ("financeiro_tipo", "VARCHAR(20) DEFAULT NULL "
+                                        "CHECK (financeiro_tipo IS NULL OR financeiro_tipo IN ('ENTRADA', 'DESPESA'))"),
+                    ("valor_total_servicos", "DECIMAL(10,2) DEFAULT 0.00"),
+                ]
                 
-                # Adicionar valor_total_servicos para SERVICO (soma dos serviços)
-                cursor.execute("""
-                    SELECT column_name FROM information_schema.columns 
-                    WHERE table_name = 'manutencoes' AND column_name = 'valor_total_servicos'
-                """)
+                # Um único ALTER TABLE com todas as colunas faltantes
+                existentes = self._get_columns(cursor, 'manutencoes')
+                pendentes = []
+                for col_name, definicao in colunas:
+                    if col_name in existentes:
+                        logger.info("   ⚠️ Coluna %s já existe. Pulando...", col_name)
+                    else:
+                        pendentes.append(f"ADD COLUMN {col_name} {definicao}")
                 
-                if cursor.fetchone():
-                    print("   ⚠️ Coluna valor_total_servicos já existe. Pulando...")
-                else:
-                    print("   📝 Adicionando coluna valor_total_servicos...")
-                    cursor.execute("""
-                        ALTER TABLE manutencoes 
-                        ADD COLUMN valor_total_servicos DECIMAL(10,2) DEFAULT 0.00
-                    """)
-                    print("   ✅ Coluna valor_total_servicos adicionada!")
+                if pendentes:
+                    logger.info("   📝 Adicionando %s coluna(s)...", len(pendentes))
+                    cursor.execute("ALTER TABLE manutencoes " + ", ".join(pendentes))
+                    logger.info("   ✅ Colunas adicionadas com sucesso!")
                 
                 conn.commit()
                 
             else:
                 # SQLite
-                print("   📝 SQLite: verificando/adicionando colunas...")
+                logger.info("   📝 SQLite: verificando/adicionando colunas...")
                 
-                cursor.execute("PRAGMA table_info(manutencoes)")
-                columns = [row[1] for row in cursor.fetchall()]
+                columns = self._get_columns(cursor, 'manutencoes')
+                colunas = [
+                    ("financeiro_lancado_em", "TEXT"),
+                    ("financeiro_tipo", "TEXT"),
+                    ("valor_total_servicos", "REAL DEFAULT 0.00"),
+                ]
                 
-                if 'financeiro_lancado_em' not in columns:
-                    cursor.execute("ALTER TABLE manutencoes ADD COLUMN financeiro_lancado_em TEXT")
-                
-                if 'financeiro_tipo' not in columns:
-                    cursor.execute("ALTER TABLE manutencoes ADD COLUMN financeiro_tipo TEXT")
-                
-                if 'valor_total_servicos' not in columns:
-                    cursor.execute("ALTER TABLE manutencoes ADD COLUMN valor_total_servicos REAL DEFAULT 0.00")
+                # SQLite aceita um ADD COLUMN por ALTER: tudo vai num único script
+                script = [
+                    f"ALTER TABLE manutencoes ADD COLUMN {col_name} {tipo};"
+                    for col_name, tipo in colunas if col_name not in columns
+                ]
+                cursor.executescript("\n".join(script))
                 
                 conn.commit()
             
-            print("   ✅ Migração 008 aplicada com sucesso!")
+            logger.info("   ✅ Migração 008 aplicada com sucesso!")
             return True
             
         except Exception as e:
-            print(f"   ❌ Erro na migração: {e}")
+            logger.error("   ❌ Erro na migração: %s", e)
             conn.rollback()
             raise
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
     
     def down(self):
         """Reverter migração"""
@@ -117,20 +102,23 @@ class Migration(BaseMigration):
         
         try:
             if self.is_postgres:
-                cursor.execute("ALTER TABLE manutencoes DROP COLUMN IF EXISTS financeiro_lancado_em")
-                cursor.execute("ALTER TABLE manutencoes DROP COLUMN IF EXISTS financeiro_tipo")
-                cursor.execute("ALTER TABLE manutencoes DROP COLUMN IF EXISTS valor_total_servicos")
+                cursor.execute("""
+                    ALTER TABLE manutencoes 
+                    DROP COLUMN IF EXISTS financeiro_lancado_em, 
+                    DROP COLUMN IF EXISTS financeiro_tipo, 
+                    DROP COLUMN IF EXISTS valor_total_servicos
+                """)
             else:
-                print("   ⚠️ SQLite não suporta DROP COLUMN diretamente")
+                logger.warning("   ⚠️ SQLite não suporta DROP COLUMN diretamente")
             
             conn.commit()
-            print("   ✅ Migração 008 revertida!")
+            logger.info("   ✅ Migração 008 revertida!")
             return True
             
         except Exception as e:
-            print(f"   ❌ Erro ao reverter: {e}")
+            logger.error("   ❌ Erro ao reverter: %s", e)
             conn.rollback()
             raise
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
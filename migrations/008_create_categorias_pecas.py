@@ -7,14 +7,18 @@ OBJETIVO: Permitir categorização de peças (Peças Hidráulicas, Pneus, Filtro
 MUDANÇAS:
 - Cria tabela categorias_pecas com empresa_id para multi-tenant
 - Adiciona coluna categoria_id na tabela pecas
-- Cria índices para performance
+- Cria índices para performance (PostgreSQL: CONCURRENTLY, fora da transação)
 
 REVERSÍVEL: Sim
 SEGURO PARA PRODUÇÃO: Sim
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Cria sistema de categorias para peças"""
@@ -28,7 +32,7 @@ class Migration(BaseMigration):
         
         try:
             if self.is_postgres:
-                print("   📝 Criando tabela categorias_pecas...")
+                logger.info("   📝 Criando tabela categorias_pecas...")
                 
                 # Criar tabela de categorias
                 cursor.execute('''
@@ -46,26 +50,17 @@ class Migration(BaseMigration):
                     )
                 ''')
                 
-                print("   📝 Adicionando coluna categoria_id em pecas...")
+                logger.info("   📝 Adicionando coluna categoria_id em pecas...")
                 
                 # Verificar se coluna já existe
-                cursor.execute('''
-                    SELECT column_name FROM information_schema.columns 
-                    WHERE table_name = 'pecas' AND column_name = 'categoria_id'
-                ''')
-                
-                if not cursor.fetchone():
+                if not self._column_exists(cursor, 'pecas', 'categoria_id'):
                     cursor.execute('ALTER TABLE pecas ADD COLUMN categoria_id INTEGER REFERENCES categorias_pecas(id)')
                 
-                print("   📝 Criando índices...")
-                
-                # Criar índices
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_categorias_pecas_empresa ON categorias_pecas(empresa_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_pecas_categoria ON pecas(categoria_id)')
+                # Índices criados após o commit (CONCURRENTLY, sem travar pecas)
                 
             else:
                 # SQLite
-                print("   📝 Criando tabela categorias_pecas...")
+                logger.info("   📝 Criando tabela categorias_pecas...")
                 
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS categorias_pecas (
@@ -83,21 +78,24 @@ class Migration(BaseMigration):
                 ''')
                 
                 # Verificar se coluna existe
-                cursor.execute("PRAGMA table_info(pecas)")
-                columns = [col[1] for col in cursor.fetchall()]
-                
-                if 'categoria_id' not in columns:
+                if not self._column_exists(cursor, 'pecas', 'categoria_id'):
                     cursor.execute('ALTER TABLE pecas ADD COLUMN categoria_id INTEGER')
             
             conn.commit()
-            print("   ✅ Tabela categorias_pecas criada com sucesso!")
+            
+            if self.is_postgres:
+                logger.info("   📝 Criando índices...")
+                self._create_index_concurrently(conn, 'idx_categorias_pecas_empresa', 'categorias_pecas(empresa_id)')
+                self._create_index_concurrently(conn, 'idx_pecas_categoria', 'pecas(categoria_id)')
+            
+            logger.info("   ✅ Tabela categorias_pecas criada com sucesso!")
             
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
 
     def down(self):
         """Reverter migração"""
@@ -112,11 +110,11 @@ class Migration(BaseMigration):
                 cursor.execute('DROP TABLE IF EXISTS categorias_pecas')
             
             conn.commit()
-            print("   ⬇️ Migração 008 revertida")
+            logger.info("   ⬇️ Migração 008 revertida")
             
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
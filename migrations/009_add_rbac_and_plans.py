@@ -25,8 +25,14 @@ REVERSÍVEL: Sim (DROP COLUMNs)
 SEGURO PARA PRODUÇÃO: Sim (ADD COLUMN com defaults)
 """
 
+import logging
+
+from psycopg2 import sql
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Adiciona RBAC e campos de planos SaaS"""
@@ -42,25 +48,14 @@ class Migration(BaseMigration):
             # ============================================
             # PARTE 1: ADICIONAR ROLE EM USUARIOS
             # ============================================
-            print("   📝 [USUARIOS] Verificando coluna role...")
+            logger.info("   📝 [USUARIOS] Verificando coluna role...")
             
-            if self.is_postgres:
-                cursor.execute("""
-                    SELECT column_name FROM information_schema.columns 
-                    WHERE table_name = 'usuarios' AND column_name = 'role'
-                """)
-            else:
-                cursor.execute("PRAGMA table_info(usuarios)")
-                columns = [row[1] for row in cursor.fetchall()]
-                has_role = 'role' in columns
-            
-            if self.is_postgres:
-                has_role = cursor.fetchone() is not None
+            usuarios_cols = self._get_columns(cursor, 'usuarios')
             
-            if has_role:
-                print("   ⚠️  Coluna role já existe. Pulando...")
+            if 'role' in usuarios_cols:
+                logger.info("   ⚠️  Coluna role já existe. Pulando...")
             else:
-                print("   📝 Adicionando coluna role...")
+                logger.info("   📝 Adicionando coluna role...")
                 if self.is_postgres:
                     cursor.execute("""
                         ALTER TABLE usuarios 
@@ -71,19 +66,21 @@ class Migration(BaseMigration):
                         ALTER TABLE usuarios 
                         ADD COLUMN role TEXT DEFAULT 'OPERADOR' NOT NULL
                     """)
-                print("   ✅ Coluna role adicionada!")
+                logger.info("   ✅ Coluna role adicionada!")
                 
                 # O primeiro usuário de cada empresa vira ADMIN
-                print("   📝 Promovendo primeiro usuário de cada empresa para ADMIN...")
+                logger.info("   📝 Promovendo primeiro usuário de cada empresa para ADMIN...")
                 if self.is_postgres:
                     cursor.execute("""
-                        UPDATE usuarios u
-                        SET role = 'ADMIN'
-                        WHERE u.id = (
-                            SELECT MIN(u2.id) 
-                            FROM usuarios u2 
-                            WHERE u2.empresa_id = u.empresa_id
+                        WITH primeiros AS (
+                            SELECT DISTINCT ON (empresa_id) id
+                            FROM usuarios
+                            WHERE empresa_id IS NOT NULL
+                            ORDER BY empresa_id, id
                         )
+                        UPDATE usuarios
+                        SET role = 'ADMIN'
+                        WHERE id IN (SELECT id FROM primeiros)
                     """)
                 else:
                     cursor.execute("""
@@ -93,12 +90,12 @@ class Migration(BaseMigration):
                             SELECT MIN(id) FROM usuarios GROUP BY empresa_id
                         )
                     """)
-                print("   ✅ Primeiros usuários promovidos a ADMIN!")
+                logger.info("   ✅ Primeiros usuários promovidos a ADMIN!")
             
             # ============================================
             # PARTE 2: ADICIONAR CAMPOS DE PLANO EM EMPRESAS
             # ============================================
-            print("   📝 [EMPRESAS] Verificando colunas de planos...")
+            logger.info("   📝 [EMPRESAS] Verificando colunas de planos...")
             
             # Lista de colunas a adicionar com seus defaults
             plan_columns = [
@@ -108,45 +105,41 @@ class Migration(BaseMigration):
                 ("limite_usuarios", "INTEGER", "3", "INTEGER", "3"),
             ]
             
+            # PostgreSQL: colunas faltantes vão num único ALTER TABLE
+            pendentes = []
+            existentes = self._get_columns(cursor, 'empresas')
+            
             for col_name, pg_type, pg_default, sqlite_type, sqlite_default in plan_columns:
-                if self.is_postgres:
+                if col_name in existentes:
+                    logger.info("   ⚠️  Coluna %s já existe. Pulando...", col_name)
+                elif self.is_postgres:
+                    pendentes.append(sql.SQL("ADD COLUMN {} {} DEFAULT {}").format(
+                        sql.Identifier(col_name), sql.SQL(pg_type), sql.SQL(pg_default)
+                    ))
+                else:
+                    logger.info("   📝 Adicionando coluna %s...", col_name)
                     cursor.execute(f"""
-                        SELECT column_name FROM information_schema.columns 
-                        WHERE table_name = 'empresas' AND column_name = '{col_name}'
+                        ALTER TABLE empresas 
+                        ADD COLUMN {col_name} {sqlite_type} DEFAULT {sqlite_default}
                     """)
-                    exists = cursor.fetchone() is not None
-                else:
-                    cursor.execute("PRAGMA table_info(empresas)")
-                    columns = [row[1] for row in cursor.fetchall()]
-                    exists = col_name in columns
-                
-                if exists:
-                    print(f"   ⚠️  Coluna {col_name} já existe. Pulando...")
-                else:
-                    print(f"   📝 Adicionando coluna {col_name}...")
-                    if self.is_postgres:
-                        cursor.execute(f"""
-                            ALTER TABLE empresas 
-                            ADD COLUMN {col_name} {pg_type} DEFAULT {pg_default}
-                        """)
-                    else:
-                        cursor.execute(f"""
-                            ALTER TABLE empresas 
-                            ADD COLUMN {col_name} {sqlite_type} DEFAULT {sqlite_default}
-                        """)
-                    print(f"   ✅ Coluna {col_name} adicionada!")
+                    logger.info("   ✅ Coluna %s adicionada!", col_name)
+            
+            if pendentes:
+                logger.info("   📝 Adicionando %s coluna(s) de planos...", len(pendentes))
+                cursor.execute(sql.SQL("ALTER TABLE empresas {}").format(sql.SQL(", ").join(pendentes)))
+                logger.info("   ✅ Colunas de planos adicionadas!")
             
             conn.commit()
-            print("   ✅ Migração 009 concluída com sucesso!")
+            logger.info("   ✅ Migração 009 concluída com sucesso!")
             return True
             
         except Exception as e:
             conn.rollback()
-            print(f"   ❌ Erro na migração: {e}")
+            logger.error("   ❌ Erro na migração: %s", e)
             raise
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
     
     def down(self):
         """Reverter migração"""
@@ -156,26 +149,28 @@ class Migration(BaseMigration):
         try:
             if self.is_postgres:
                 # Remover colunas de empresas
-                print("   📝 Removendo colunas de planos de empresas...")
-                for col in ['plano', 'limite_clientes', 'limite_veiculos', 'limite_usuarios']:
-                    try:
-                        cursor.execute(f"ALTER TABLE empresas DROP COLUMN IF EXISTS {col}")
-                        print(f"   ✅ Coluna {col} removida!")
-                    except:
-                        pass
+                logger.info("   📝 Removendo colunas de planos de empresas...")
+                cursor.execute("""
+                    ALTER TABLE empresas 
+                    DROP COLUMN IF EXISTS plano, 
+                    DROP COLUMN IF EXISTS limite_clientes, 
+                    DROP COLUMN IF EXISTS limite_veiculos, 
+                    DROP COLUMN IF EXISTS limite_usuarios
+                """)
+                logger.info("   ✅ Colunas de planos removidas!")
                 
                 # Remover coluna role de usuarios
-                print("   📝 Removendo coluna role de usuarios...")
+                logger.info("   📝 Removendo coluna role de usuarios...")
                 cursor.execute("ALTER TABLE usuarios DROP COLUMN IF EXISTS role")
-                print("   ✅ Coluna role removida!")
+                logger.info("   ✅ Coluna role removida!")
                 
             conn.commit()
             return True
             
         except Exception as e:
             conn.rollback()
-            print(f"   ❌ Erro ao reverter migração: {e}")
+            logger.error("   ❌ Erro ao reverter migração: %s", e)
             raise
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
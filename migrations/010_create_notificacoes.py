@@ -28,8 +28,67 @@ REVERSÍVEL: Sim (DROP TABLE)
 SEGURO PARA PRODUÇÃO: Sim
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
+
+# DDL por backend, montada uma vez no import. Tudo com IF NOT EXISTS: com a
+# tabela já criada, o próprio servidor pula cada comando
+_PG_DDL = (
+    """
+        CREATE TABLE IF NOT EXISTS notificacoes (
+            id SERIAL PRIMARY KEY,
+            empresa_id INTEGER NOT NULL REFERENCES empresas(id) ON DELETE CASCADE,
+            usuario_id INTEGER REFERENCES usuarios(id) ON DELETE CASCADE,
+            tipo VARCHAR(50) NOT NULL DEFAULT 'SISTEMA',
+            titulo VARCHAR(200) NOT NULL,
+            mensagem TEXT,
+            lida BOOLEAN DEFAULT FALSE,
+            link VARCHAR(500),
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE INDEX IF NOT EXISTS idx_notificacoes_empresa 
+        ON notificacoes(empresa_id)
+    """,
+    """
+        CREATE INDEX IF NOT EXISTS idx_notificacoes_usuario 
+        ON notificacoes(usuario_id)
+    """,
+    """
+        CREATE INDEX IF NOT EXISTS idx_notificacoes_lida 
+        ON notificacoes(empresa_id, lida)
+    """,
+    """
+        CREATE INDEX IF NOT EXISTS idx_notificacoes_created 
+        ON notificacoes(created_at DESC)
+    """,
+)
+
+_SQLITE_DDL = (
+    """
+        CREATE TABLE IF NOT EXISTS notificacoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            empresa_id INTEGER NOT NULL,
+            usuario_id INTEGER,
+            tipo TEXT NOT NULL DEFAULT 'SISTEMA',
+            titulo TEXT NOT NULL,
+            mensagem TEXT,
+            lida INTEGER DEFAULT 0,
+            link TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (empresa_id) REFERENCES empresas(id),
+            FOREIGN KEY (usuario_id) REFERENCES usuarios(id)
+        )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_notificacoes_empresa ON notificacoes(empresa_id)",
+    "CREATE INDEX IF NOT EXISTS idx_notificacoes_usuario ON notificacoes(usuario_id)",
+)
+
 
 class Migration(BaseMigration):
     """Criar tabela de notificações"""
@@ -42,101 +101,24 @@ class Migration(BaseMigration):
         cursor = conn.cursor()
         
         try:
-            print("   📝 Verificando se tabela notificacoes existe...")
+            logger.info("   📝 Criando tabela notificacoes e índices (se não existirem)...")
             
-            if self.is_postgres:
-                # PostgreSQL
-                cursor.execute("""
-                    SELECT EXISTS (
-                        SELECT FROM information_schema.tables 
-                        WHERE table_name = 'notificacoes'
-                    )
-                """)
-                exists = cursor.fetchone()[0]
-                
-                if exists:
-                    print("   ⚠️  Tabela notificacoes já existe. Pulando...")
-                else:
-                    print("   📝 Criando tabela notificacoes...")
-                    cursor.execute("""
-                        CREATE TABLE notificacoes (
-                            id SERIAL PRIMARY KEY,
-                            empresa_id INTEGER NOT NULL REFERENCES empresas(id) ON DELETE CASCADE,
-                            usuario_id INTEGER REFERENCES usuarios(id) ON DELETE CASCADE,
-                            tipo VARCHAR(50) NOT NULL DEFAULT 'SISTEMA',
-                            titulo VARCHAR(200) NOT NULL,
-                            mensagem TEXT,
-                            lida BOOLEAN DEFAULT FALSE,
-                            link VARCHAR(500),
-                            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                        )
-                    """)
-                    print("   ✅ Tabela notificacoes criada!")
-                    
-                    # Criar índices
-                    print("   📝 Criando índices...")
-                    cursor.execute("""
-                        CREATE INDEX IF NOT EXISTS idx_notificacoes_empresa 
-                        ON notificacoes(empresa_id)
-                    """)
-                    cursor.execute("""
-                        CREATE INDEX IF NOT EXISTS idx_notificacoes_usuario 
-                        ON notificacoes(usuario_id)
-                    """)
-                    cursor.execute("""
-                        CREATE INDEX IF NOT EXISTS idx_notificacoes_lida 
-                        ON notificacoes(empresa_id, lida)
-                    """)
-                    cursor.execute("""
-                        CREATE INDEX IF NOT EXISTS idx_notificacoes_created 
-                        ON notificacoes(created_at DESC)
-                    """)
-                    print("   ✅ Índices criados!")
-                
-            else:
-                # SQLite
-                cursor.execute("""
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name='notificacoes'
-                """)
-                
-                if cursor.fetchone():
-                    print("   ⚠️  Tabela notificacoes já existe. Pulando...")
-                else:
-                    print("   📝 Criando tabela notificacoes...")
-                    cursor.execute("""
-                        CREATE TABLE notificacoes (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            empresa_id INTEGER NOT NULL,
-                            usuario_id INTEGER,
-                            tipo TEXT NOT NULL DEFAULT 'SISTEMA',
-                            titulo TEXT NOT NULL,
-                            mensagem TEXT,
-                            lida INTEGER DEFAULT 0,
-                            link TEXT,
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                            FOREIGN KEY (empresa_id) REFERENCES empresas(id),
-                            FOREIGN KEY (usuario_id) REFERENCES usuarios(id)
-                        )
-                    """)
-                    print("   ✅ Tabela notificacoes criada!")
-                    
-                    # Índices SQLite
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notificacoes_empresa ON notificacoes(empresa_id)")
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notificacoes_usuario ON notificacoes(usuario_id)")
-                    print("   ✅ Índices criados!")
+            for statement in (_PG_DDL if self.is_postgres else _SQLITE_DDL):
+                cursor.execute(statement)
+            
+            logger.info("   ✅ Tabela notificacoes e índices garantidos!")
             
             conn.commit()
-            print("   ✅ Migração 010 concluída com sucesso!")
+            logger.info("   ✅ Migração 010 concluída com sucesso!")
             return True
             
         except Exception as e:
             conn.rollback()
-            print(f"   ❌ Erro na migração: {e}")
+            logger.error("   ❌ Erro na migração: %s", e)
             raise
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
     
     def down(self):
         """Reverter migração"""
@@ -150,13 +132,13 @@ class Migration(BaseMigration):
                 cursor.execute("DROP TABLE IF EXISTS notificacoes")
             
             conn.commit()
-            print("   ✅ Tabela notificacoes removida!")
+            logger.info("   ✅ Tabela notificacoes removida!")
             return True
             
         except Exception as e:
             conn.rollback()
-            print(f"   ❌ Erro ao reverter migração: {e}")
+            logger.error("   ❌ Erro ao reverter migração: %s", e)
             raise
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
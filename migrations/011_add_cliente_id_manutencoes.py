@@ -4,8 +4,12 @@ Para vincular manutenções/ordens de serviço a clientes
 E permitir envio de orçamentos via WhatsApp
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Adicionar cliente_id em manutencoes para vincular ao cliente"""
@@ -20,7 +24,7 @@ class Migration(BaseMigration):
         
         try:
             if self.is_postgres:
-                print("   📝 Adicionando coluna cliente_id em manutencoes...")
+                logger.info("   📝 Adicionando coluna cliente_id em manutencoes...")
                 
                 # Verificar se coluna já existe
                 cursor.execute('''
@@ -37,9 +41,9 @@ class Migration(BaseMigration):
                     # Criar índice para performance
                     cursor.execute('CREATE INDEX IF NOT EXISTS idx_manutencoes_cliente ON manutencoes(cliente_id)')
                     
-                    print("   ✅ Coluna cliente_id adicionada com sucesso!")
+                    logger.info("   ✅ Coluna cliente_id adicionada com sucesso!")
                 else:
-                    print("   ⏭️ Coluna cliente_id já existe")
+                    logger.info("   ⏭️ Coluna cliente_id já existe")
                 
             else:
                 # SQLite
@@ -48,9 +52,9 @@ class Migration(BaseMigration):
                 
                 if 'cliente_id' not in columns:
                     cursor.execute('ALTER TABLE manutencoes ADD COLUMN cliente_id INTEGER')
-                    print("   ✅ Coluna cliente_id adicionada com sucesso!")
+                    logger.info("   ✅ Coluna cliente_id adicionada com sucesso!")
                 else:
-                    print("   ⏭️ Coluna cliente_id já existe")
+                    logger.info("   ⏭️ Coluna cliente_id já existe")
             
             conn.commit()
             
@@ -59,7 +63,7 @@ class Migration(BaseMigration):
             raise e
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
 
     def down(self):
         """Reverter migração"""
@@ -80,4 +84,4 @@ class Migration(BaseMigration):
             raise e
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
@@ -3,8 +3,12 @@ Migration 012: Tornar veiculo_id opcional em manutencoes
 Para modo SERVIÇO, veículos são opcionais (muitos serviços são em implementos, não veículos)
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Tornar veiculo_id opcional para modo SERVICO"""
@@ -17,7 +21,7 @@ class Migration(BaseMigration):
         cursor = conn.cursor()
         
         try:
-            print("   📝 Alterando veiculo_id para permitir NULL...")
+            logger.info("   📝 Alterando veiculo_id para permitir NULL...")
             
             cursor.execute('''
                 ALTER TABLE manutencoes 
@@ -25,13 +29,13 @@ class Migration(BaseMigration):
             ''')
             
             conn.commit()
-            print("   ✅ veiculo_id agora é opcional")
+            logger.info("   ✅ veiculo_id agora é opcional")
             
         except Exception as e:
             conn.rollback()
             raise e
         finally:
-            conn.close()
+            self.release_connection(conn)
     
     def down(self):
         """Reverter migração"""
@@ -57,4 +61,4 @@ class Migration(BaseMigration):
             conn.rollback()
             raise e
         finally:
-            conn.close()
+            self.release_connection(conn)
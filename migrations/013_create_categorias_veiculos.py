@@ -3,8 +3,12 @@ Migration 013: Criar tabela de categorias de veículos/equipamentos
 Permite que cada empresa personalize suas próprias categorias
 """
 
+import logging
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
 
 class Migration(BaseMigration):
     """Criar tabela de categorias de veículos personalizáveis"""
@@ -17,7 +21,7 @@ class Migration(BaseMigration):
         cursor = conn.cursor()
         
         try:
-            print("   📝 Criando tabela categorias_veiculos...")
+            logger.info("   📝 Criando tabela categorias_veiculos...")
             
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS categorias_veiculos (
@@ -40,13 +44,13 @@ class Migration(BaseMigration):
             ''')
             
             conn.commit()
-            print("   ✅ Tabela categorias_veiculos criada com sucesso")
+            logger.info("   ✅ Tabela categorias_veiculos criada com sucesso")
             
         except Exception as e:
             conn.rollback()
             raise e
         finally:
-            conn.close()
+            self.release_connection(conn)
     
     def down(self):
         """Reverter migração"""
@@ -61,4 +65,4 @@ class Migration(BaseMigration):
             conn.rollback()
             raise e
         finally:
-            conn.close()
+            self.release_connection(conn)
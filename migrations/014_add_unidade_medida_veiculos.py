@@ -4,8 +4,29 @@ Para permitir escolher entre km (quilômetros) e hr (horas de trabalho)
 Máquinas e equipamentos usam horas, veículos usam km
 """
 
+import logging
+import time
+
 from migrations.migration_manager import BaseMigration
 
+logger = logging.getLogger(__name__)
+
+
+# Tipos de veículo medidos em horas de trabalho (comparados em minúsculas)
+TIPOS_HORAS = [
+    'máquina', 'maquina', 'equipamento', 'prensa', 'compressor', 'gerador',
+    'bomba', 'empilhadeira', 'guincho', 'implemento', 'ferramenta',
+]
+
+# Faixa de ids atualizada por transação no backfill (PostgreSQL)
+LOTE_BACKFILL = 10000
+
+# Segundos de espera após cada faixa com linhas atualizadas (PostgreSQL)
+PAUSA_BACKFILL = 0.1
+
+# Comentário da coluna enquanto o backfill não termina (PostgreSQL)
+MARCADOR_BACKFILL = 'backfill pendente (migração 014)'
+
 
 class Migration(BaseMigration):
     """Adicionar campo unidade_medida para km/hr"""
@@ -18,32 +39,75 @@ class Migration(BaseMigration):
         cursor = conn.cursor()
         
         try:
-            print("   📝 Adicionando coluna unidade_medida em veiculos...")
+            logger.info("   📝 Adicionando coluna unidade_medida em veiculos...")
             
-            # Verificar se coluna já existe
-            cursor.execute("""
-                SELECT column_name FROM information_schema.columns 
-                WHERE table_name = 'veiculos' AND column_name = 'unidade_medida'
-            """)
+            if self.is_postgres:
+                if not self._column_exists(cursor, 'veiculos', 'unidade_medida'):
+                    # PG 11+: ADD COLUMN com DEFAULT constante só altera o
+                    # catálogo. O comentário marca o backfill como pendente, na
+                    # mesma transação; commit logo em seguida para liberar o
+                    # lock exclusivo da tabela
+                    cursor.execute("""
+                        ALTER TABLE veiculos 
+                        ADD COLUMN unidade_medida VARCHAR(10) DEFAULT 'km'
+                    """)
+                    cursor.execute(
+                        "COMMENT ON COLUMN veiculos.unidade_medida IS %s",
+                        (MARCADOR_BACKFILL,)
+                    )
+                    conn.commit()
+                    logger.info("   ✅ Coluna unidade_medida adicionada")
+                
+                # Backfill só enquanto o marcador existir: coluna adicionada
+                # por esta migração (nesta execução ou numa interrompida antes
+                # do fim). Coluna criada por outro caminho fica como está
+                cursor.execute(
+                    "SELECT col_description('veiculos'::regclass, attnum) FROM pg_attribute "
+                    "WHERE attrelid = 'veiculos'::regclass AND attname = 'unidade_medida'"
+                )
+                if cursor.fetchone()[0] != MARCADOR_BACKFILL:
+                    logger.info("   ⏭️ Coluna unidade_medida já existe")
+                else:
+                    # Só as linhas de equipamentos mudam para 'hr', em faixas de
+                    # id (PK) com um commit por faixa: limita o tempo de lock e
+                    # o WAL por transação. Pausa só depois de faixas que
+                    # atualizaram linhas, para autovacuum e réplicas acompanharem
+                    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM veiculos")
+                    max_id = cursor.fetchone()[0]
+                    atualizados = 0
+                    for inicio in range(0, max_id, LOTE_BACKFILL):
+                        cursor.execute("""
+                            UPDATE veiculos 
+                            SET unidade_medida = 'hr'
+                            WHERE id > %s AND id <= %s 
+                            AND unidade_medida = 'km' AND LOWER(tipo) = ANY(%s)
+                        """, (inicio, inicio + LOTE_BACKFILL, TIPOS_HORAS))
+                        linhas = cursor.rowcount
+                        conn.commit()
+                        if linhas:
+                            atualizados += linhas
+                            time.sleep(PAUSA_BACKFILL)
+                    
+                    cursor.execute("COMMENT ON COLUMN veiculos.unidade_medida IS NULL")
+                    logger.info("   ✅ Unidades atualizadas para %s equipamento(s) existente(s)", atualizados)
             
-            if not cursor.fetchone():
+            elif not self._column_exists(cursor, 'veiculos', 'unidade_medida'):
                 cursor.execute("""
                     ALTER TABLE veiculos 
                     ADD COLUMN unidade_medida VARCHAR(10) DEFAULT 'km'
                 """)
-                print("   ✅ Coluna unidade_medida adicionada")
+                logger.info("   ✅ Coluna unidade_medida adicionada")
                 
                 # Atualizar registros existentes baseado no tipo
-                cursor.execute("""
+                marcadores = ', '.join('?' * len(TIPOS_HORAS))
+                cursor.execute(f"""
                     UPDATE veiculos 
                     SET unidade_medida = 'hr'
-                    WHERE LOWER(tipo) IN ('máquina', 'maquina', 'equipamento', 'prensa', 
-                                          'compressor', 'gerador', 'bomba', 'empilhadeira',
-                                          'guincho', 'implemento', 'ferramenta')
-                """)
-                print("   ✅ Unidades atualizadas para equipamentos existentes")
+                    WHERE LOWER(tipo) IN ({marcadores})
+                """, TIPOS_HORAS)
+                logger.info("   ✅ Unidades atualizadas para equipamentos existentes")
             else:
-                print("   ⏭️ Coluna unidade_medida já existe")
+                logger.info("   ⏭️ Coluna unidade_medida já existe")
             
             conn.commit()
             
@@ -51,7 +115,7 @@ class Migration(BaseMigration):
             conn.rollback()
             raise e
         finally:
-            conn.close()
+            self.release_connection(conn)
     
     def down(self):
         """Reverter migração"""
@@ -67,4 +131,4 @@ class Migration(BaseMigration):
             conn.rollback()
             raise e
         finally:
-            conn.close()
+            self.release_connection(conn)
@@ -0,0 +1,148 @@
+"""
+Migração 015: Ajustar índices e armazenamento da tabela notificacoes
+====================================================================
+
+OBJETIVO: Trocar os índices criados pela migração 010 por índices no formato
+das consultas e ajustar o armazenamento à rotatividade da tabela, também em
+bancos onde a 010 já foi aplicada
+
+ÍNDICES NOVOS:
+- (empresa_id, created_at DESC): listagem "mais recentes da empresa" e a
+  checagem de duplicidade dos cron jobs; cobre também filtros só por empresa_id
+- (empresa_id, created_at DESC) WHERE lida = FALSE: contador de não lidas e
+  "marcar todas como lidas"; parcial, só contém as não lidas
+- BRIN (created_at), só PostgreSQL: consultas por período sem empresa
+  (limpeza/auditoria). A tabela só recebe INSERT em ordem de created_at,
+  então um resumo por faixa de 32 páginas basta e o índice fica minúsculo
+
+ÍNDICES REMOVIDOS (cobertos pelos novos):
+- idx_notificacoes_empresa (empresa_id)
+- idx_notificacoes_lida (empresa_id, lida)
+- idx_notificacoes_created (created_at DESC)
+
+idx_notificacoes_usuario (usuario_id) continua: atende o ON DELETE CASCADE
+a partir de usuarios.
+
+ARMAZENAMENTO (PostgreSQL):
+- fillfactor 85: espaço livre na página para a nova versão da linha no
+  UPDATE lida = true, sem estender a tabela. Não vira HOT update, porque
+  lida está no predicado de idx_notificacoes_nao_lidas; o contador de não
+  lidas compensa, e cada linha só muda de não lida para lida uma vez
+- autovacuum_vacuum_scale_factor 0.05: tabela de alta rotatividade, vacuum
+  a cada 5% de linhas mortas (padrão: 20%)
+Aplicados com ALTER TABLE SET, que só muda o catálogo: o fillfactor vale
+para as páginas gravadas daqui em diante, sem reescrever a tabela.
+
+PostgreSQL: CREATE/DROP INDEX CONCURRENTLY, sem travar a tabela. Os novos
+índices são criados antes de remover os antigos, então as consultas nunca
+ficam sem índice.
+
+REVERSÍVEL: Sim (recria os índices da 010 e volta ao armazenamento padrão)
+SEGURO PARA PRODUÇÃO: Sim
+"""
+
+import logging
+
+from migrations.migration_manager import BaseMigration
+
+logger = logging.getLogger(__name__)
+
+
+# (nome, definição) por backend
+_PG_NOVOS = (
+    ('idx_notificacoes_empresa_created', 'notificacoes(empresa_id, created_at DESC)'),
+    ('idx_notificacoes_nao_lidas', 'notificacoes(empresa_id, created_at DESC) WHERE lida = FALSE'),
+    ('idx_notificacoes_created_brin', 'notificacoes USING BRIN (created_at) WITH (pages_per_range = 32)'),
+)
+_SQLITE_NOVOS = (
+    ('idx_notificacoes_empresa_created', 'notificacoes(empresa_id, created_at DESC)'),
+    ('idx_notificacoes_nao_lidas', 'notificacoes(empresa_id, created_at DESC) WHERE lida = 0'),
+)
+
+# Parâmetros de armazenamento (PostgreSQL), ver ARMAZENAMENTO acima
+_PG_STORAGE = "fillfactor = 85, autovacuum_vacuum_scale_factor = 0.05"
+
+# Índices da migração 010 substituídos pelos novos
+_ANTIGOS = (
+    ('idx_notificacoes_empresa', 'notificacoes(empresa_id)'),
+    ('idx_notificacoes_lida', 'notificacoes(empresa_id, lida)'),
+    ('idx_notificacoes_created', 'notificacoes(created_at DESC)'),
+)
+
+
+class Migration(BaseMigration):
+    """Ajusta índices e armazenamento de notificacoes"""
+    
+    name = "Ajustar índices e armazenamento de notificacoes"
+    
+    def up(self):
+        """Aplicar migração"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            if self.is_postgres:
+                logger.info("   📝 Ajustando armazenamento de notificacoes...")
+                cursor.execute(f"ALTER TABLE notificacoes SET ({_PG_STORAGE})")
+                conn.commit()
+            
+            logger.info("   📝 Criando índices compostos de notificacoes...")
+            
+            if self.is_postgres:
+                for nome, definicao in _PG_NOVOS:
+                    self._create_index_concurrently(conn, nome, definicao)
+                
+                logger.info("   📝 Removendo índices substituídos...")
+                for nome, _ in _ANTIGOS:
+                    self._drop_index_concurrently(conn, nome)
+            else:
+                for nome, definicao in _SQLITE_NOVOS:
+                    cursor.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {definicao}")
+                
+                logger.info("   📝 Removendo índices substituídos...")
+                for nome, _ in _ANTIGOS:
+                    cursor.execute(f"DROP INDEX IF EXISTS {nome}")
+                
+                conn.commit()
+            
+            logger.info("   ✅ Índices de notificacoes ajustados!")
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            self.release_connection(conn)
+    
+    def down(self):
+        """Reverter migração"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            if self.is_postgres:
+                for nome, definicao in _ANTIGOS:
+                    self._create_index_concurrently(conn, nome, definicao)
+                for nome, _ in _PG_NOVOS:
+                    self._drop_index_concurrently(conn, nome)
+                
+                cursor.execute("""
+                    ALTER TABLE notificacoes 
+                    RESET (fillfactor, autovacuum_vacuum_scale_factor)
+                """)
+            else:
+                for nome, definicao in _ANTIGOS:
+                    cursor.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {definicao}")
+                for nome, _ in _SQLITE_NOVOS:
+                    cursor.execute(f"DROP INDEX IF EXISTS {nome}")
+                
+                conn.commit()
+            
+            logger.info("   ⬇️ Migração 015 revertida")
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            self.release_connection(conn)
@@ -0,0 +1,167 @@
+"""
+Migração 016: Ajustar índices e armazenamento de ordens_servico (PostgreSQL)
+============================================================================
+
+OBJETIVO: Aplicar ajustes de índice e de armazenamento em ordens_servico
+também em bancos onde a migração 006 já foi aplicada
+
+MUDANÇAS:
+- Índice (empresa_id, status) parcial, cobrindo apenas status ativos
+  (RASCUNHO, ORCAMENTO, APROVADO, EM_EXECUCAO), substitui o índice completo
+  idx_ordens_servico_empresa_status: nenhuma consulta filtra OS por status
+  terminal
+- Tabela com fillfactor 80: OS são muito atualizadas (status, datas,
+  updated_at); o espaço livre permite HOT updates na mesma página. Aplicado
+  com ALTER TABLE SET, que só muda o catálogo e vale para as páginas
+  gravadas daqui em diante
+- Índices compostos com fillfactor 90 para reduzir page splits
+- Remove o trigger BEFORE INSERT generate_numero_os: numero_os é gerado
+  pelo app (proximo_numero_os, sequence por empresa), e o trigger fazia um
+  SELECT MAX() por insert
+- idx_ordens_servico_data_abertura_cobertura: (empresa_id, data_abertura
+  DESC) INCLUDE (status, cliente_id, valor_total), para a listagem de OS
+  recentes por empresa ser index-only; substitui
+  idx_ordens_servico_data_abertura
+
+PostgreSQL: CREATE/DROP INDEX CONCURRENTLY, sem travar a tabela; os índices
+novos são criados antes de remover os antigos. SQLite: nada a fazer (mantém
+os índices da 006).
+
+REVERSÍVEL: Sim (recria os índices e o trigger da 006 e volta ao fillfactor padrão)
+SEGURO PARA PRODUÇÃO: Sim
+"""
+
+import logging
+
+from migrations.migration_manager import BaseMigration
+
+logger = logging.getLogger(__name__)
+
+
+# (nome, definição) dos índices criados por esta migração
+_NOVOS = (
+    (
+        'idx_ordens_servico_empresa_status_ativas',
+        "ordens_servico(empresa_id, status) WITH (fillfactor = 90) "
+        "WHERE status IN ('RASCUNHO', 'ORCAMENTO', 'APROVADO', 'EM_EXECUCAO')",
+    ),
+    (
+        'idx_ordens_servico_data_abertura_cobertura',
+        "ordens_servico(empresa_id, data_abertura DESC) "
+        "INCLUDE (status, cliente_id, valor_total) WITH (fillfactor = 90)",
+    ),
+)
+
+# Índices da migração 006 substituídos pelos novos
+_ANTIGOS = (
+    ('idx_ordens_servico_empresa_status', 'ordens_servico(empresa_id, status)'),
+    ('idx_ordens_servico_data_abertura', 'ordens_servico(empresa_id, data_abertura DESC)'),
+)
+
+# Trigger de numero_os da migração 006, recriado pelo down()
+_PG_NUMERO_OS_TRIGGER = (
+    """
+        CREATE OR REPLACE FUNCTION generate_numero_os()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            next_number INTEGER;
+            ano_atual VARCHAR(4);
+        BEGIN
+            IF NEW.numero_os IS NULL OR NEW.numero_os = '' THEN
+                ano_atual := TO_CHAR(CURRENT_DATE, 'YYYY');
+
+                SELECT COALESCE(MAX(
+                    CAST(
+                        SUBSTRING(numero_os FROM POSITION('-' IN numero_os) + 1 FOR 
+                        POSITION('/' IN numero_os) - POSITION('-' IN numero_os) - 1)
+                    AS INTEGER)
+                ), 0) + 1
+                INTO next_number
+                FROM ordens_servico
+                WHERE empresa_id = NEW.empresa_id 
+                AND numero_os LIKE 'OS-%/' || ano_atual;
+
+                NEW.numero_os := 'OS-' || LPAD(next_number::TEXT, 6, '0') || '/' || ano_atual;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+
+    """
+        DROP TRIGGER IF EXISTS trigger_generate_numero_os ON ordens_servico;
+        CREATE TRIGGER trigger_generate_numero_os
+            BEFORE INSERT ON ordens_servico
+            FOR EACH ROW
+            EXECUTE FUNCTION generate_numero_os();
+    """,
+)
+
+
+class Migration(BaseMigration):
+    """Ajusta índices e armazenamento de ordens_servico"""
+    
+    name = "Ajustar índices e armazenamento de ordens_servico"
+    
+    def up(self):
+        """Aplicar migração"""
+        if not self.is_postgres:
+            logger.info("   ⏭️ SQLite: nada a ajustar em ordens_servico")
+            return
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            logger.info("   📝 Ajustando fillfactor de ordens_servico...")
+            cursor.execute("ALTER TABLE ordens_servico SET (fillfactor = 80)")
+            
+            logger.info("   📝 Removendo trigger generate_numero_os...")
+            cursor.execute("DROP TRIGGER IF EXISTS trigger_generate_numero_os ON ordens_servico")
+            cursor.execute("DROP FUNCTION IF EXISTS generate_numero_os()")
+            conn.commit()
+            
+            logger.info("   📝 Criando índices de ordens_servico...")
+            for nome, definicao in _NOVOS:
+                self._create_index_concurrently(conn, nome, definicao)
+            
+            logger.info("   📝 Removendo índices substituídos...")
+            for nome, _ in _ANTIGOS:
+                self._drop_index_concurrently(conn, nome)
+            
+            logger.info("   ✅ Índices de ordens_servico ajustados!")
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            self.release_connection(conn)
+    
+    def down(self):
+        """Reverter migração"""
+        if not self.is_postgres:
+            return
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            for nome, definicao in _ANTIGOS:
+                self._create_index_concurrently(conn, nome, definicao)
+            for nome, _ in _NOVOS:
+                self._drop_index_concurrently(conn, nome)
+            
+            # Conexão já em autocommit (CONCURRENTLY acima)
+            cursor.execute("ALTER TABLE ordens_servico RESET (fillfactor)")
+            for statement in _PG_NUMERO_OS_TRIGGER:
+                cursor.execute(statement)
+            
+            logger.info("   ⬇️ Migração 016 revertida")
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            self.release_connection(conn)
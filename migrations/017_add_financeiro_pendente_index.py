@@ -0,0 +1,80 @@
+"""
+Migração 017: Índice de pendências financeiras em manutencoes
+=============================================================
+
+OBJETIVO: Acelerar a busca do cron por serviços finalizados ainda não
+lançados no financeiro, também em bancos onde a migração 008 já foi aplicada
+
+MUDANÇAS:
+- Índice parcial idx_manutencoes_financeiro_pendente em
+  manutencoes(empresa_id), só com linhas WHERE status = 'FINALIZADO' AND
+  financeiro_lancado_em IS NULL (o predicado usado pelo cron_jobs)
+
+PostgreSQL: CREATE INDEX CONCURRENTLY, sem travar manutencoes.
+
+REVERSÍVEL: Sim (DROP INDEX)
+SEGURO PARA PRODUÇÃO: Sim
+"""
+
+import logging
+
+from migrations.migration_manager import BaseMigration
+
+logger = logging.getLogger(__name__)
+
+
+_NOME = 'idx_manutencoes_financeiro_pendente'
+_DEFINICAO = (
+    "manutencoes(empresa_id) "
+    "WHERE status = 'FINALIZADO' AND financeiro_lancado_em IS NULL"
+)
+
+
+class Migration(BaseMigration):
+    """Cria índice parcial de pendências financeiras"""
+    
+    name = "Criar índice de pendências financeiras em manutencoes"
+    
+    def up(self):
+        """Aplicar migração"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            logger.info("   📝 Criando índice de pendências financeiras...")
+            
+            if self.is_postgres:
+                self._create_index_concurrently(conn, _NOME, _DEFINICAO)
+            else:
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {_NOME} ON {_DEFINICAO}")
+                conn.commit()
+            
+            logger.info("   ✅ Índice %s criado!", _NOME)
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            self.release_connection(conn)
+    
+    def down(self):
+        """Reverter migração"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            if self.is_postgres:
+                self._drop_index_concurrently(conn, _NOME)
+            else:
+                cursor.execute(f"DROP INDEX IF EXISTS {_NOME}")
+                conn.commit()
+            
+            logger.info("   ⬇️ Migração 017 revertida")
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            self.release_connection(conn)
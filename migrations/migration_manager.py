@@ -7,18 +7,179 @@ Suporta PostgreSQL e SQLite (dev local).
 """
 
 import os
+import re
+import sys
+import functools
+import hashlib
 import importlib
+import logging
+from contextlib import contextmanager
 import psycopg2
 from psycopg2 import sql
+from psycopg2.pool import ThreadedConnectionPool
 from psycopg2.extras import RealDictCursor
 import sqlite3
-from datetime import datetime
+import time
 from typing import Optional, List, Dict
 
 
+# Arquivos de migração: "NNN_nome.py"
+_MIGRATION_RE = re.compile(r'^\d+_.*\.py$')
+
+# Sentinela com o banco e a última versão aplicados neste host (ver is_up_to_date)
+SENTINEL_FILENAME = '.last_applied'
+
+# Identifica as conexões das migrações em pg_stat_activity / métricas do Fly
+APPLICATION_NAME = 'gestor-migrations'
+
+
+logger = logging.getLogger('migrations')
+
+
+def _configure_logging():
+    """Envia o log das migrações (logger "migrations") para stdout, uma única vez"""
+    logger = logging.getLogger('migrations')
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+@functools.lru_cache(maxsize=None)
+def _enable_sqlite_wal(db_path: str):
+    """Ativa WAL no arquivo (persistente no banco, basta uma vez por processo)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+
+
+def _connect_sqlite(database_url: str):
+    """
+    Abre conexão SQLite (dev local) com pragmas de desempenho
+    
+    WAL + synchronous=NORMAL: um fsync por commit em vez de dois, e leitores
+    não bloqueiam o escritor. Os demais pragmas valem só para a conexão.
+    """
+    db_path = database_url.replace('sqlite:///', '')
+    _enable_sqlite_wal(db_path)
+    
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MB de cache de páginas
+    return conn
+
+
+def _reset_connection(conn):
+    """Encerra a transação aberta e desliga o autocommit, para reutilizar a conexão"""
+    if isinstance(conn, sqlite3.Connection):
+        conn.rollback()
+    elif not conn.closed:
+        conn.rollback()
+        conn.autocommit = False
+
+
+def _release_connection(pool, conn):
+    """Devolve a conexão ao pool limpa (sem transação, sem autocommit) ou a fecha"""
+    if pool is None:
+        conn.close()
+        return
+    
+    _reset_connection(conn)
+    pool.putconn(conn)
+
+
+class _PGDialect:
+    """SQL do controle de versões (schema_migrations) no PostgreSQL"""
+    
+    schema_table_ddl = """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            id SERIAL PRIMARY KEY,
+            version VARCHAR(255) UNIQUE NOT NULL,
+            name VARCHAR(500) NOT NULL,
+            applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            execution_time_ms INTEGER,
+            success BOOLEAN DEFAULT TRUE,
+            error_message TEXT
+        )
+    """
+    
+    record_stmt = """
+        INSERT INTO schema_migrations 
+        (version, name, execution_time_ms, success, error_message)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (version) DO UPDATE SET
+            applied_at = CURRENT_TIMESTAMP,
+            execution_time_ms = EXCLUDED.execution_time_ms,
+            success = EXCLUDED.success,
+            error_message = EXCLUDED.error_message
+    """
+    
+    delete_stmt = "DELETE FROM schema_migrations WHERE version = %s"
+    
+    def schema_table_exists(self, cursor) -> bool:
+        """Consulta ao catálogo, mais barata que o DDL quando a tabela já existe"""
+        cursor.execute("SELECT to_regclass('schema_migrations')")
+        return cursor.fetchone()[0] is not None
+    
+    def applied_versions(self, cursor) -> List[str]:
+        # Uma linha só com o array (o psycopg2 devolve text[] como list)
+        cursor.execute("""
+            SELECT COALESCE(array_agg(version ORDER BY version), '{}') 
+            FROM schema_migrations WHERE success
+        """)
+        return cursor.fetchone()[0]
+    
+    def record_params(self, version, name, execution_time, success, error_message) -> tuple:
+        return (version, name, execution_time, success, error_message)
+
+
+class _SQLiteDialect:
+    """SQL do controle de versões (schema_migrations) no SQLite"""
+    
+    schema_table_ddl = """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            version TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            execution_time_ms INTEGER,
+            success BOOLEAN DEFAULT 1,
+            error_message TEXT
+        )
+    """
+    
+    record_stmt = """
+        INSERT OR REPLACE INTO schema_migrations 
+        (version, name, execution_time_ms, success, error_message)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    
+    delete_stmt = "DELETE FROM schema_migrations WHERE version = ?"
+    
+    def schema_table_exists(self, cursor) -> bool:
+        # CREATE TABLE IF NOT EXISTS é local e barato no SQLite
+        return False
+    
+    def applied_versions(self, cursor) -> List[str]:
+        cursor.execute("SELECT version FROM schema_migrations WHERE success = 1 ORDER BY version")
+        return [row[0] for row in cursor.fetchall()]
+    
+    def record_params(self, version, name, execution_time, success, error_message) -> tuple:
+        return (version, name, execution_time, 1 if success else 0, error_message)
+
+
 class MigrationManager:
     """Gerenciador de migrações do banco de dados"""
     
+    # Bancos (database_url) cuja tabela schema_migrations já foi garantida neste processo
+    _schema_table_ready: set = set()
+    
     def __init__(self, database_url: str):
         """
         Inicializa o gerenciador de migrações
@@ -28,50 +189,87 @@ class MigrationManager:
         """
         self.database_url = database_url
         self.is_postgres = database_url.startswith('postgresql://') or database_url.startswith('postgres://')
+        # SQL do controle de versões, escolhido uma vez por backend
+        self.dialect = _PGDialect() if self.is_postgres else _SQLiteDialect()
         self.migrations_dir = os.path.dirname(__file__)
+        # Pool PostgreSQL compartilhado com as migrações (criado sob demanda)
+        self._pool = None
+        # Conexão única da execução atual (ver _shared_connection)
+        self._conn = None
+        # [(version, filename)] ordenado, montado na primeira leitura do diretório
+        self._migration_files_cache = None
+        # Classes Migration já importadas, por versão
+        self._migration_classes: Dict[str, type] = {}
+        _configure_logging()
         
     def get_connection(self):
-        """Obtém conexão com o banco de dados"""
+        """Obtém conexão com o banco de dados (a da execução atual, se houver)"""
+        if self._conn is not None:
+            return self._conn
         if self.is_postgres:
-            return psycopg2.connect(self.database_url)
+            return self._get_pool().getconn()
         else:
             # SQLite para desenvolvimento local
-            db_path = self.database_url.replace('sqlite:///', '')
-            return sqlite3.connect(db_path)
+            return _connect_sqlite(self.database_url)
+    
+    def release_connection(self, conn):
+        """Devolve a conexão ao pool (SQLite: fecha); a da execução atual só é limpa"""
+        if conn is self._conn:
+            _reset_connection(conn)
+        else:
+            _release_connection(self._pool, conn)
+    
+    @contextmanager
+    def _shared_connection(self):
+        """
+        Abre uma única conexão para toda a execução
+        
+        Controle de versões e todas as migrações usam a mesma conexão, em vez
+        de um handshake (TCP + autenticação) por método. Ao sair, a conexão
+        volta ao pool e o pool é fechado. Chamadas aninhadas reutilizam a
+        conexão já aberta.
+        """
+        if self._conn is not None:
+            yield self._conn
+            return
+        
+        self._conn = self.get_connection()
+        try:
+            yield self._conn
+        finally:
+            conn, self._conn = self._conn, None
+            self.release_connection(conn)
+            self.close_pool()
+    
+    def close_pool(self):
+        """Fecha todas as conexões do pool PostgreSQL"""
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+    
+    def _get_pool(self):
+        """Pool PostgreSQL, também repassado às migrações (None no SQLite)"""
+        if self.is_postgres and self._pool is None:
+            self._pool = ThreadedConnectionPool(
+                1, 5, self.database_url, application_name=APPLICATION_NAME
+            )
+        return self._pool
     
     def ensure_migrations_table(self):
-        """Garante que a tabela de controle de migrações existe"""
+        """Garante que a tabela de controle de migrações existe (uma vez por processo)"""
+        if self.database_url in self._schema_table_ready:
+            return
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        if self.is_postgres:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS schema_migrations (
-                    id SERIAL PRIMARY KEY,
-                    version VARCHAR(255) UNIQUE NOT NULL,
-                    name VARCHAR(500) NOT NULL,
-                    applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                    execution_time_ms INTEGER,
-                    success BOOLEAN DEFAULT TRUE,
-                    error_message TEXT
-                )
-            """)
-        else:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS schema_migrations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    version TEXT UNIQUE NOT NULL,
-                    name TEXT NOT NULL,
-                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    execution_time_ms INTEGER,
-                    success BOOLEAN DEFAULT 1,
-                    error_message TEXT
-                )
-            """)
+        if not self.dialect.schema_table_exists(cursor):
+            cursor.execute(self.dialect.schema_table_ddl)
         
         conn.commit()
         cursor.close()
-        conn.close()
+        self.release_connection(conn)
+        self._schema_table_ready.add(self.database_url)
     
     def get_applied_migrations(self) -> List[str]:
         """Retorna lista de migrações já aplicadas"""
@@ -79,37 +277,98 @@ class MigrationManager:
         cursor = conn.cursor()
         
         try:
-            cursor.execute(
-                "SELECT version FROM schema_migrations WHERE success = TRUE ORDER BY version"
-                if self.is_postgres else
-                "SELECT version FROM schema_migrations WHERE success = 1 ORDER BY version"
-            )
-            
-            if self.is_postgres:
-                migrations = [row[0] for row in cursor.fetchall()]
-            else:
-                migrations = [row[0] for row in cursor.fetchall()]
-            
-            return migrations
+            return self.dialect.applied_versions(cursor)
         except Exception:
             return []
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
+    
+    def get_migration_files(self) -> List[tuple]:
+        """Retorna [(version, filename)] de todos os arquivos de migração, em ordem"""
+        if self._migration_files_cache is None:
+            with os.scandir(self.migrations_dir) as entries:
+                filenames = sorted(
+                    entry.name for entry in entries
+                    if entry.is_file() and _MIGRATION_RE.match(entry.name)
+                )
+            self._migration_files_cache = [(filename[:-3], filename) for filename in filenames]
+        
+        return self._migration_files_cache
+    
+    def _sentinel_value(self) -> Optional[str]:
+        """
+        Conteúdo esperado do sentinela: hash da URL do banco + última versão
+        
+        O hash amarra o sentinela ao banco em que as migrações rodaram; outro
+        DATABASE_URL (ou um sentinela copiado de outra máquina) não confere.
+        """
+        migration_files = self.get_migration_files()
+        if not migration_files:
+            return None
+        
+        url = self.database_url.replace('postgres://', 'postgresql://', 1)
+        db_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+        return f"{db_hash}:{migration_files[-1][0]}"
+    
+    def is_up_to_date(self) -> bool:
+        """
+        Verifica, sem consultar o banco, se o sentinela aponta para a última migração
+        
+        O sentinela é gravado ao fim de uma execução bem-sucedida; um arquivo
+        de migração novo, um rollback ou outro banco o tornam desatualizado.
+        """
+        try:
+            with open(os.path.join(self.migrations_dir, SENTINEL_FILENAME)) as f:
+                recorded = f.read().strip()
+        except OSError:
+            return False
+        
+        expected = self._sentinel_value()
+        return expected is not None and recorded == expected
+    
+    def _write_sentinel(self):
+        """Grava banco e última versão do diretório no sentinela (falha de escrita é ignorada)"""
+        value = self._sentinel_value()
+        if value is None:
+            return
+        
+        try:
+            with open(os.path.join(self.migrations_dir, SENTINEL_FILENAME), 'w') as f:
+                f.write(value)
+        except OSError:
+            pass
+    
+    def clear_sentinel(self):
+        """Remove o sentinela, forçando a próxima verificação no banco"""
+        try:
+            os.remove(os.path.join(self.migrations_dir, SENTINEL_FILENAME))
+        except OSError:
+            pass
+    
+    def invalidate_cache(self):
+        """Força nova leitura do diretório de migrações"""
+        self._migration_files_cache = None
+        self._migration_classes.clear()
+    
+    def _get_migration_class(self, version: str) -> type:
+        """Importa o módulo da migração uma única vez e retorna sua classe Migration"""
+        migration_class = self._migration_classes.get(version)
+        if migration_class is None:
+            migration_module = importlib.import_module(f"migrations.{version}")
+            migration_class = getattr(migration_module, 'Migration')
+            self._migration_classes[version] = migration_class
+        
+        return migration_class
     
     def get_pending_migrations(self) -> List[tuple]:
         """Retorna lista de migrações pendentes"""
-        applied = set(self.get_applied_migrations())
-        all_migrations = []
+        applied = frozenset(self.get_applied_migrations())
         
-        # Listar todos os arquivos de migração
-        for filename in sorted(os.listdir(self.migrations_dir)):
-            if filename.endswith('.py') and filename[0].isdigit():
-                version = filename.replace('.py', '')
-                if version not in applied:
-                    all_migrations.append((version, filename))
-        
-        return all_migrations
+        return [
+            (version, filename) for version, filename in self.get_migration_files()
+            if version not in applied
+        ]
     
     def run_migration(self, version: str, filename: str) -> bool:
         """
@@ -122,64 +381,53 @@ class MigrationManager:
         Returns:
             True se sucesso, False caso contrário
         """
-        print(f"\n🔄 Executando migração: {version}")
+        logger.info("\n🔄 Executando migração: %s", version)
         
-        start_time = datetime.now()
+        start_time = time.perf_counter_ns()
         
-        try:
-            # Importar módulo da migração
-            module_name = f"migrations.{filename.replace('.py', '')}"
-            migration_module = importlib.import_module(module_name)
-            
-            # Obter classe de migração
-            migration_class = getattr(migration_module, 'Migration')
-            migration = migration_class(self.database_url, self.is_postgres)
-            
-            # Executar migração
-            migration.up()
-            
-            # Registrar sucesso
-            execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
-            self._record_migration(version, migration.name, execution_time, True, None)
-            
-            print(f"✅ Migração {version} aplicada com sucesso ({execution_time}ms)")
-            return True
-            
-        except Exception as e:
-            execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
-            error_msg = str(e)
-            self._record_migration(version, version, execution_time, False, error_msg)
-            
-            print(f"❌ Erro ao aplicar migração {version}: {error_msg}")
-            return False
+        with self._shared_connection() as conn:
+            try:
+                migration_class = self._get_migration_class(filename.replace('.py', ''))
+                migration = migration_class(self.database_url, self.is_postgres, self._get_pool(), conn=conn)
+                
+                migration.up()
+                
+                # Só marca como aplicada depois que up() terminou: várias
+                # migrações fazem commits intermediários (014, 008, e o
+                # executescript do SQLite), e um registro gravado antes
+                # deixaria uma migração interrompida como "aplicada" para sempre.
+                # Sucesso e tempo de execução vão no mesmo commit, feito já.
+                execution_time = (time.perf_counter_ns() - start_time) // 1_000_000
+                self._record_migration(version, migration.name, execution_time, True, None)
+                conn.commit()
+                
+                logger.info("✅ Migração %s aplicada com sucesso (%sms)", version, execution_time)
+                return True
+                
+            except Exception as e:
+                execution_time = (time.perf_counter_ns() - start_time) // 1_000_000
+                error_msg = str(e)
+                conn.rollback()
+                self._record_migration(version, version, execution_time, False, error_msg)
+                conn.commit()
+                
+                logger.error("❌ Erro ao aplicar migração %s: %s", version, error_msg)
+                return False
     
     def _record_migration(self, version: str, name: str, execution_time: int, 
                          success: bool, error_message: Optional[str]):
-        """Registra execução da migração"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        if self.is_postgres:
-            cursor.execute("""
-                INSERT INTO schema_migrations 
-                (version, name, execution_time_ms, success, error_message)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (version) DO UPDATE SET
-                    applied_at = CURRENT_TIMESTAMP,
-                    execution_time_ms = EXCLUDED.execution_time_ms,
-                    success = EXCLUDED.success,
-                    error_message = EXCLUDED.error_message
-            """, (version, name, execution_time, success, error_message))
-        else:
-            cursor.execute("""
-                INSERT OR REPLACE INTO schema_migrations 
-                (version, name, execution_time_ms, success, error_message)
-                VALUES (?, ?, ?, ?, ?)
-            """, (version, name, execution_time, 1 if success else 0, error_message))
+        """
+        Registra execução da migração
         
-        conn.commit()
+        Não faz commit: quem chama decide quando a transação aberta da
+        conexão compartilhada é gravada.
+        """
+        cursor = self._conn.cursor()
+        cursor.execute(
+            self.dialect.record_stmt,
+            self.dialect.record_params(version, name, execution_time, success, error_message)
+        )
         cursor.close()
-        conn.close()
     
     def run_pending_migrations(self) -> Dict[str, any]:
         """
@@ -188,91 +436,90 @@ class MigrationManager:
         Returns:
             Dicionário com resultados da execução
         """
-        print("\n" + "="*70)
-        print("🚀 INICIANDO MIGRAÇÕES DO BANCO DE DADOS")
-        print("="*70)
-        
-        # Garantir tabela de controle
-        self.ensure_migrations_table()
-        
-        # Obter migrações pendentes
-        pending = self.get_pending_migrations()
-        
-        if not pending:
-            print("\n✅ Não há migrações pendentes. Banco de dados está atualizado!")
-            return {'success': True, 'migrations_run': 0, 'errors': []}
-        
-        print(f"\n📋 Encontradas {len(pending)} migração(ões) pendente(s)")
-        
-        # Executar migrações
-        results = {'success': True, 'migrations_run': 0, 'errors': []}
+        logger.info("\n%s\n🚀 INICIANDO MIGRAÇÕES DO BANCO DE DADOS\n%s", "="*70, "="*70)
         
-        for version, filename in pending:
-            success = self.run_migration(version, filename)
+        with self._shared_connection():
+            # Garantir tabela de controle
+            self.ensure_migrations_table()
             
-            if success:
-                results['migrations_run'] += 1
-            else:
-                results['success'] = False
-                results['errors'].append(version)
-                print(f"\n⚠️  Parando execução devido a erro na migração {version}")
-                break
+            # Obter migrações pendentes
+            pending = self.get_pending_migrations()
+            
+            if not pending:
+                logger.info("\n✅ Não há migrações pendentes. Banco de dados está atualizado!")
+                self._write_sentinel()
+                return {'success': True, 'migrations_run': 0, 'errors': []}
+            
+            logger.info("\n📋 Encontradas %s migração(ões) pendente(s)", len(pending))
+            
+            # Executar migrações
+            results = {'success': True, 'migrations_run': 0, 'errors': []}
+            
+            for version, filename in pending:
+                success = self.run_migration(version, filename)
+                
+                if success:
+                    results['migrations_run'] += 1
+                else:
+                    results['success'] = False
+                    results['errors'].append(version)
+                    logger.warning("\n⚠️  Parando execução devido a erro na migração %s", version)
+                    break
+            
+            self._conn.commit()
         
-        print("\n" + "="*70)
         if results['success']:
-            print(f"✅ MIGRAÇÕES CONCLUÍDAS COM SUCESSO!")
-            print(f"   {results['migrations_run']} migração(ões) aplicada(s)")
+            self._write_sentinel()
+        
+        # Resumo em um único registro de log
+        if results['success']:
+            logger.info(
+                "\n%s\n✅ MIGRAÇÕES CONCLUÍDAS COM SUCESSO!\n   %s migração(ões) aplicada(s)\n%s\n",
+                "="*70, results['migrations_run'], "="*70
+            )
         else:
-            print(f"❌ ERRO NAS MIGRAÇÕES")
-            print(f"   {results['migrations_run']} aplicada(s), {len(results['errors'])} falhou")
-        print("="*70 + "\n")
+            logger.error(
+                "\n%s\n❌ ERRO NAS MIGRAÇÕES\n   %s aplicada(s), %s falhou\n%s\n",
+                "="*70, results['migrations_run'], len(results['errors']), "="*70
+            )
         
         return results
     
     def rollback_last_migration(self) -> bool:
         """Reverte a última migração aplicada"""
-        applied = self.get_applied_migrations()
-        
-        if not applied:
-            print("ℹ️  Não há migrações para reverter")
-            return True
-        
-        last_version = applied[-1]
-        filename = f"{last_version}.py"
-        
-        print(f"\n🔄 Revertendo migração: {last_version}")
-        
-        try:
-            # Importar módulo da migração
-            module_name = f"migrations.{last_version}"
-            migration_module = importlib.import_module(module_name)
+        with self._shared_connection():
+            applied = self.get_applied_migrations()
             
-            # Obter classe de migração
-            migration_class = getattr(migration_module, 'Migration')
-            migration = migration_class(self.database_url, self.is_postgres)
-            
-            # Executar rollback
-            migration.down()
-            
-            # Remover registro
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            if self.is_postgres:
-                cursor.execute("DELETE FROM schema_migrations WHERE version = %s", (last_version,))
-            else:
-                cursor.execute("DELETE FROM schema_migrations WHERE version = ?", (last_version,))
+            if not applied:
+                logger.info("ℹ️  Não há migrações para reverter")
+                return True
             
-            conn.commit()
-            cursor.close()
-            conn.close()
+            last_version = applied[-1]
+            filename = f"{last_version}.py"
             
-            print(f"✅ Migração {last_version} revertida com sucesso")
-            return True
+            logger.info("\n🔄 Revertendo migração: %s", last_version)
+            self.clear_sentinel()
             
-        except Exception as e:
-            print(f"❌ Erro ao reverter migração {last_version}: {e}")
-            return False
+            try:
+                migration_class = self._get_migration_class(last_version)
+                migration = migration_class(self.database_url, self.is_postgres, self._get_pool(), conn=self._conn)
+                
+                # Executar rollback sem transação aberta: o down() de 015/016
+                # usa CONCURRENTLY e passa a conexão para autocommit
+                migration.down()
+                
+                # Remover registro só depois que down() terminou
+                cursor = self._conn.cursor()
+                cursor.execute(self.dialect.delete_stmt, (last_version,))
+                cursor.close()
+                self._conn.commit()
+                
+                logger.info("✅ Migração %s revertida com sucesso", last_version)
+                return True
+                
+            except Exception as e:
+                logger.error("❌ Erro ao reverter migração %s: %s", last_version, e)
+                return False
     
     def migration_status(self):
         """Exibe status das migrações"""
@@ -300,18 +547,42 @@ class MigrationManager:
 class BaseMigration:
     """Classe base para migrações"""
     
-    def __init__(self, database_url: str, is_postgres: bool):
+    def __init__(self, database_url: str, is_postgres: bool, pool=None, conn=None):
         self.database_url = database_url
         self.is_postgres = is_postgres
         self.name = self.__class__.__name__
+        # Pool do MigrationManager; sem pool, cada conexão é aberta e fechada
+        self.pool = pool
+        # Conexão injetada pelo MigrationManager (pertence a ele) ou aberta
+        # na primeira chamada de get_connection e reutilizada depois
+        self._conn = conn
+        self._owns_conn = conn is None
     
     def get_connection(self):
-        """Obtém conexão com o banco"""
-        if self.is_postgres:
-            return psycopg2.connect(self.database_url)
-        else:
-            db_path = self.database_url.replace('sqlite:///', '')
-            return sqlite3.connect(db_path)
+        """Obtém conexão com o banco (aberta uma vez e reutilizada)"""
+        if self._conn is None:
+            if not self.is_postgres:
+                self._conn = _connect_sqlite(self.database_url)
+            elif self.pool is not None:
+                self._conn = self.pool.getconn()
+            else:
+                self._conn = psycopg2.connect(self.database_url, application_name=APPLICATION_NAME)
+        return self._conn
+    
+    def release_connection(self, conn):
+        """
+        Termina o uso da conexão
+        
+        A conexão injetada só é limpa (rollback, autocommit desligado) para a
+        próxima migração; uma conexão própria volta ao pool ou é fechada.
+        """
+        if not self._owns_conn:
+            _reset_connection(conn)
+            return
+        
+        if conn is self._conn:
+            self._conn = None
+        _release_connection(self.pool, conn)
     
     def execute(self, query: str, params: tuple = None):
         """Executa uma query"""
@@ -326,7 +597,82 @@ class BaseMigration:
             conn.commit()
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
+    
+    def _column_exists(self, cursor, table: str, column: str) -> bool:
+        """
+        Verifica se uma coluna existe (tabela inexistente retorna False)
+        
+        No PostgreSQL consulta pg_attribute direto; to_regclass evita erro
+        (e transação abortada) quando a tabela ainda não existe.
+        """
+        if self.is_postgres:
+            cursor.execute("""
+                SELECT 1 FROM pg_attribute 
+                WHERE attrelid = to_regclass(%s) AND attname = %s 
+                AND attnum > 0 AND NOT attisdropped
+            """, (table, column))
+            return cursor.fetchone() is not None
+        
+        return column in self._get_columns(cursor, table)
+    
+    def _get_columns(self, cursor, table: str) -> set:
+        """Retorna o conjunto de colunas da tabela em uma única consulta"""
+        if self.is_postgres:
+            cursor.execute("""
+                SELECT attname FROM pg_attribute 
+                WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped
+            """, (table,))
+        else:
+            cursor.execute(f"PRAGMA table_info({table})")
+            return {row[1] for row in cursor.fetchall()}
+        
+        return {row[0] for row in cursor.fetchall()}
+    
+    def _create_index_concurrently(self, conn, name: str, definition: str):
+        """
+        Cria índice sem bloquear escritas (CREATE INDEX CONCURRENTLY)
+        
+        Só PostgreSQL. CONCURRENTLY não roda dentro de transação, então deve
+        ser chamado depois do commit da migração; a conexão passa para
+        autocommit. Um índice inválido deixado por uma tentativa anterior
+        interrompida é removido e recriado.
+        
+        Args:
+            conn: Conexão PostgreSQL (já com a transação da migração commitada)
+            name: Nome do índice
+            definition: Tabela e colunas, ex: "pecas(categoria_id)"
+        """
+        conn.autocommit = True
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+                (name,)
+            )
+            row = cursor.fetchone()
+            if row and not row[0]:
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            
+            cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+        finally:
+            cursor.close()
+    
+    def _drop_index_concurrently(self, conn, name: str):
+        """
+        Remove índice sem bloquear leituras e escritas (DROP INDEX CONCURRENTLY)
+        
+        Só PostgreSQL; mesmas regras de _create_index_concurrently (fora de
+        transação, conexão em autocommit).
+        """
+        conn.autocommit = True
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        finally:
+            cursor.close()
     
     def up(self):
         """Aplicar migração - deve ser sobrescrito"""
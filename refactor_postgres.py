@@ -4,10 +4,40 @@ Script to automatically refactor app.py from SQLite+PostgreSQL to PostgreSQL-onl
 This removes all if Config.IS_POSTGRES: ... else: sqlite3... patterns.
 """
 
+import mmap
+import os
 import re
 import sys
 
+# Patterns compiled once at import
+_IF_POSTGRES_RE = re.compile(r'^(\s*)if Config\.IS_POSTGRES:')
+_LEADING_WS_RE = re.compile(r'^(\s*)')
+
+# Inline ternaries -> PostgreSQL value
+_TERNARY_REPLACEMENTS = (
+    # 'PostgreSQL' if Config.IS_POSTGRES else 'SQLite'
+    (re.compile(r"'PostgreSQL' if Config\.IS_POSTGRES else 'SQLite'"), "'PostgreSQL'"),
+    # 'produção' if Config.IS_POSTGRES else 'desenvolvimento'
+    (re.compile(r"'produção' if Config\.IS_POSTGRES else 'desenvolvimento'"), "'produção'"),
+    # 'true' if Config.IS_POSTGRES else '1'
+    (re.compile(r"'true' if Config\.IS_POSTGRES else '1'"), "'true'"),
+    # ativo_val = 'true' if Config.IS_POSTGRES else '1'
+    (re.compile(r"ativo_val = 'true' if Config\.IS_POSTGRES else '1'"), "ativo_val = 'true'"),
+)
+
+def _has_marker(filepath, marker=b'Config.IS_POSTGRES'):
+    """Check for the marker via mmap, without reading/decoding the whole file."""
+    if os.path.getsize(filepath) == 0:  # mmap cannot map an empty file
+        return False
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm.find(marker) != -1
+
+
 def refactor_file(filepath):
+    # Fast path: nothing to refactor, skip the read/transform/write entirely
+    if not _has_marker(filepath):
+        return 0, False
+    
     with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
     
@@ -23,25 +53,9 @@ def refactor_file(filepath):
     #     conn = sqlite3.connect(DATABASE)
     
     # First, let's find and fix simple inline ternary expressions
-    # Pattern: 'PostgreSQL' if Config.IS_POSTGRES else 'SQLite'
-    pattern_ternary = r"'PostgreSQL' if Config\.IS_POSTGRES else 'SQLite'"
-    content, n = re.subn(pattern_ternary, "'PostgreSQL'", content)
-    blocks_fixed += n
-    
-    # Pattern: 'produção' if Config.IS_POSTGRES else 'desenvolvimento'
-    pattern_ternary2 = r"'produção' if Config\.IS_POSTGRES else 'desenvolvimento'"
-    content, n = re.subn(pattern_ternary2, "'produção'", content)
-    blocks_fixed += n
-    
-    # Pattern: 'true' if Config.IS_POSTGRES else '1'
-    pattern_ternary3 = r"'true' if Config\.IS_POSTGRES else '1'"
-    content, n = re.subn(pattern_ternary3, "'true'", content)
-    blocks_fixed += n
-    
-    # Pattern: ativo_val = 'true' if Config.IS_POSTGRES else '1'
-    pattern_ativo = r"ativo_val = 'true' if Config\.IS_POSTGRES else '1'"
-    content, n = re.subn(pattern_ativo, "ativo_val = 'true'", content)
-    blocks_fixed += n
+    for pattern, replacement in _TERNARY_REPLACEMENTS:
+        content, n = pattern.subn(replacement, content)
+        blocks_fixed += n
     
     # Pattern for simple one-line if/else queries
     # if Config.IS_POSTGRES:
@@ -61,9 +75,9 @@ def refactor_file(filepath):
         stripped = line.strip()
         
         # Check for if Config.IS_POSTGRES: pattern
-        if re.match(r'^(\s*)if Config\.IS_POSTGRES:', line):
-            indent_match = re.match(r'^(\s*)', line)
-            base_indent = indent_match.group(1) if indent_match else ''
+        if_match = _IF_POSTGRES_RE.match(line)
+        if if_match:
+            base_indent = if_match.group(1)
             
             # Find the else: and collect the if-branch
             j = i + 1
@@ -73,8 +87,7 @@ def refactor_file(filepath):
             
             # Calculate expected indent for block contents
             if j < len(lines):
-                content_match = re.match(r'^(\s*)', lines[j])
-                content_indent = content_match.group(1) if content_match else base_indent + '    '
+                content_indent = _LEADING_WS_RE.match(lines[j]).group(1)
             else:
                 content_indent = base_indent + '    '
             
@@ -84,7 +97,7 @@ def refactor_file(filepath):
                 current_stripped = current_line.strip()
                 
                 # Check for else: at the same indent level as the if
-                if current_stripped == 'else:' and current_line.startswith(base_indent) and len(re.match(r'^(\s*)', current_line).group(1)) == len(base_indent):
+                if current_stripped == 'else:' and _LEADING_WS_RE.match(current_line).group(1) == base_indent:
                     else_found = True
                     else_line_idx = j
                     break
@@ -172,11 +185,14 @@ def refactor_file(filepath):
     
     content = '\n'.join(new_lines)
     
-    # Write the result
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
+    changed = original_content != content
+    
+    # Write the result only if something changed
+    if changed:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(content)
     
-    return blocks_fixed, original_content != content
+    return blocks_fixed, changed
 
 
 if __name__ == '__main__':
@@ -5,21 +5,68 @@ Módulo de Relatórios - Sistema de Gestão de Manutenção
 Este módulo gera relatórios em PDF para o sistema.
 """
 
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
 from datetime import datetime
+from types import SimpleNamespace
 import os
 
+# reportlab só é importado na primeira geração de PDF (ver _get_rl):
+# workers que só servem HTML não pagam o custo do import
+_rl = None
+
+def _get_rl():
+    """Importa o reportlab e monta os estilos compartilhados uma única vez"""
+    global _rl
+    if _rl is None:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib import colors
+        from reportlab.lib.units import inch
+        
+        styles = getSampleStyleSheet()
+        _rl = SimpleNamespace(
+            A4=A4,
+            SimpleDocTemplate=SimpleDocTemplate,
+            LongTable=LongTable,
+            Paragraph=Paragraph,
+            Spacer=Spacer,
+            styles=styles,
+            title_style=ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=18,
+                spaceAfter=30,
+                alignment=1  # Centralizado
+            ),
+            table_style=TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]),
+            # Soma 6.25in: cabe na área útil do A4 com as margens padrão (1in)
+            col_widths=[0.5 * inch, 1.9 * inch, 1.1 * inch, 1.1 * inch, 0.8 * inch, 0.85 * inch],
+        )
+    return _rl
+
 class ReportGenerator:
     """Gerador de relatórios em PDF"""
     
+    # styles é property (estilos compartilhados no módulo), não atributo
+    __slots__ = ('reports_folder',)
+    
     def __init__(self, reports_folder='reports'):
         self.reports_folder = reports_folder
         os.makedirs(reports_folder, exist_ok=True)
-        self.styles = getSampleStyleSheet()
+    
+    @property
+    def styles(self):
+        """Folha de estilos padrão do reportlab (carregada sob demanda)"""
+        return _get_rl().styles
     
     def generate_maintenance_report(self, manutencoes, filename=None):
         """Gera relatório de manutenções em PDF"""
@@ -30,58 +77,46 @@ class ReportGenerator:
         
         filepath = os.path.join(self.reports_folder, filename)
         
-        doc = SimpleDocTemplate(filepath, pagesize=A4)
+        rl = _get_rl()
+        Paragraph = rl.Paragraph
+        doc = rl.SimpleDocTemplate(filepath, pagesize=rl.A4)
         elements = []
         
         # Título
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=1  # Centralizado
-        )
-        
-        title = Paragraph("Relatório de Manutenções", title_style)
+        title = Paragraph("Relatório de Manutenções", rl.title_style)
         elements.append(title)
         
         # Data do relatório
         date_p = Paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}", 
-                          self.styles['Normal'])
+                          rl.styles['Normal'])
         elements.append(date_p)
-        elements.append(Spacer(1, 20))
+        elements.append(rl.Spacer(1, 20))
         
         # Tabela de dados
         if manutencoes:
             headers = ['ID', 'Veículo', 'Tipo', 'Data Agendada', 'Status', 'Custo']
             data = [headers]
+            append = data.append
             
+            # m.get ligado uma vez por linha: evita a busca do método a cada campo
             for m in manutencoes:
-                row = [
-                    str(m.get('id', '')),
-                    f"{m.get('placa', '')} - {m.get('modelo', '')}",
-                    m.get('tipo', ''),
-                    m.get('data_agendada', ''),
-                    m.get('status', ''),
-                    f"R$ {m.get('custo_total', 0):.2f}"
-                ]
-                data.append(row)
+                g = m.get
+                append([
+                    str(g('id', '')),
+                    f"{g('placa', '')} - {g('modelo', '')}",
+                    g('tipo', ''),
+                    g('data_agendada', ''),
+                    g('status', ''),
+                    f"R$ {g('custo_total', 0):.2f}"
+                ])
             
-            table = Table(data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            # LongTable quebra entre páginas repetindo o cabeçalho
+            table = rl.LongTable(data, colWidths=rl.col_widths, repeatRows=1)
+            table.setStyle(rl.table_style)
             
             elements.append(table)
         else:
-            elements.append(Paragraph("Nenhuma manutenção encontrada.", self.styles['Normal']))
+            elements.append(Paragraph("Nenhuma manutenção encontrada.", rl.styles['Normal']))
         
         doc.build(elements)
         return filepath
\ No newline at end of file
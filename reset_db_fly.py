@@ -9,6 +9,7 @@ USE COM CUIDADO - Remove todas as migrações registradas para permitir re-execu
 import os
 import sys
 import psycopg2
+from psycopg2 import sql
 
 def reset_migrations():
     """Remove a tabela schema_migrations para permitir re-execução das migrações"""
@@ -26,21 +27,40 @@ def reset_migrations():
     print(f"\n🔗 Conectando ao banco...")
     
     try:
-        conn = psycopg2.connect(database_url)
+        conn = psycopg2.connect(database_url, application_name='gestor-reset-db')
         cursor = conn.cursor()
         
-        # Listar tabelas existentes
+        # Listar tabelas, funções e sequences de numero_os (criadas pelo app,
+        # não pertencem a nenhuma tabela) do schema public em uma única consulta
         cursor.execute("""
-            SELECT table_name 
+            SELECT 'table' AS tipo, table_name AS nome
             FROM information_schema.tables 
             WHERE table_schema = 'public' 
-            ORDER BY table_name
+            UNION ALL
+            SELECT 'func', proname
+            FROM pg_proc 
+            WHERE pronamespace = 'public'::regnamespace
+            UNION ALL
+            SELECT 'seq', relname
+            FROM pg_class 
+            WHERE relkind = 'S' AND relnamespace = 'public'::regnamespace 
+            AND relname ~ '^ordens_servico_seq_[0-9]+$'
+            ORDER BY 1, 2
         """)
-        tables = [row[0] for row in cursor.fetchall()]
+        objetos = {'table': [], 'func': [], 'seq': []}
+        for tipo, nome in cursor.fetchall():
+            objetos[tipo].append(nome)
+        tables = objetos['table']
+        functions = objetos['func']
+        sequences = objetos['seq']
         
         print(f"\n📋 Tabelas existentes: {tables}")
+        if functions:
+            print(f"📋 Funções existentes: {functions}")
+        if sequences:
+            print(f"📋 Sequences de numero_os: {sequences}")
         
-        if not tables:
+        if not tables and not sequences:
             print("\n✅ Banco vazio - pronto para migrações")
             return
         
@@ -53,21 +73,33 @@ def reset_migrations():
             sys.exit(0)
         
         # Dropar todas as tabelas
+        # Um único DROP para todas: uma ida ao servidor e CASCADE resolve as FKs
         print("\n🗑️  Removendo tabelas...")
-        for table in reversed(tables):  # Ordem reversa para respeitar FKs
-            try:
-                cursor.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
-                print(f"   ✓ {table}")
-            except Exception as e:
-                print(f"   ✗ {table}: {e}")
+        if tables:
+            cursor.execute(
+                sql.SQL("DROP TABLE IF EXISTS {} CASCADE").format(
+                    sql.SQL(', ').join(sql.Identifier(t) for t in tables)
+                )
+            )
+        for table in tables:
+            print(f"   ✓ {table}")
         
-        # Dropar funções
-        cursor.execute("""
-            SELECT proname FROM pg_proc 
-            WHERE pronamespace = 'public'::regnamespace
-        """)
+        # CASCADE não alcança as sequences de numero_os (sem dono)
+        if sequences:
+            cursor.execute(
+                sql.SQL("DROP SEQUENCE IF EXISTS {}").format(
+                    sql.SQL(', ').join(sql.Identifier(s) for s in sequences)
+                )
+            )
+            for seq in sequences:
+                print(f"   ✓ {seq}")
         
         conn.commit()
+        
+        # O sentinela deste host diria que o banco recém-zerado está em dia
+        from migrations.migration_manager import MigrationManager
+        MigrationManager(database_url).clear_sentinel()
+        
         print("\n✅ Banco resetado com sucesso!")
         
     except Exception as e:
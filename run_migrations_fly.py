@@ -7,10 +7,10 @@ Não depende de dotenv (usa variáveis de ambiente diretas)
 import os
 import sys
 
-# Adicionar diretório de migrações ao path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'migrations'))
+# Adicionar diretório do projeto ao path (pacote migrations)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from migration_manager import MigrationManager
+from migrations.migration_manager import MigrationManager
 
 def main():
     """Executa migrações pendentes"""
@@ -0,0 +1,49 @@
+"""
+Testes do MigrationManager contra um PostgreSQL real
+====================================================
+
+Defina TEST_DATABASE_URL com um banco descartável: os testes aplicam e
+revertem migrações nele. Sem a variável, os testes são pulados.
+"""
+
+import os
+
+import pytest
+
+from migrations.migration_manager import MigrationManager
+
+DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL não definida")
+
+
+def _indices(manager, tabela):
+    """Nomes dos índices da tabela"""
+    conn = manager.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", (tabela,))
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+        manager.release_connection(conn)
+
+
+def test_rollback_016_com_indices_concurrently():
+    """down() da 016 usa CONCURRENTLY: o rollback não pode rodar dentro de transação"""
+    manager = MigrationManager(DATABASE_URL)
+
+    result = manager.run_pending_migrations()
+    assert result['success'], result['errors']
+
+    # Reverte as migrações posteriores até chegar na 016
+    while '016_tune_ordens_servico' in manager.get_applied_migrations():
+        assert manager.rollback_last_migration()
+
+    indices = _indices(manager, 'ordens_servico')
+    assert 'idx_ordens_servico_empresa_status' in indices
+    assert 'idx_ordens_servico_empresa_status_ativas' not in indices
+
+    # Reaplica, deixando o banco como estava
+    assert manager.run_pending_migrations()['success']
+    manager.clear_sentinel()
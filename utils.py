@@ -7,8 +7,59 @@ Este módulo contém funções utilitárias e helpers usados em todo o sistema.
 
 from datetime import datetime, date
 from decimal import Decimal
+import functools
+import heapq
 import re
 import os
+import string
+import sys
+
+# Padrões compilados uma vez no import
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PLACA_OLD_RE = re.compile(r'^[A-Z]{3}[0-9]{4}$')          # ABC1234
+_PLACA_MERC_RE = re.compile(r'^[A-Z]{3}[0-9][A-Z][0-9]{2}$')  # ABC1D23
+_CURRENCY_STRIP_RE = re.compile(r'[R$\s]')
+_UNSAFE_FILE_RE = re.compile(r'[<>:"/\\|?*]')
+_WS_RE = re.compile(r'\s+')
+
+class _DigitsOnly(dict):
+    """
+    Tabela de str.translate que mantém apenas dígitos (como re.sub(r'\\D', '', s))
+    
+    Preenchida sob demanda: cada caractere é classificado uma vez e depois
+    a consulta fica toda em C, sem passar pelo motor de regex.
+    """
+    
+    def __missing__(self, codepoint):
+        keep = codepoint if chr(codepoint).isdecimal() else None
+        self[codepoint] = keep
+        return keep
+
+_KEEP_DIGITS = _DigitsOnly()
+
+# Prepara placa em uma passada: maiúsculas ASCII e remove '-' e ' '
+_PLACA_PREP = str.maketrans(string.ascii_lowercase, string.ascii_uppercase, '- ')
+
+# Fator bytes -> MB pré-calculado (multiplicação em vez de divisão)
+_BYTES_TO_MB = 1.0 / (1024 * 1024)
+
+# Troca separadores en-US -> pt-BR (1,234.56 -> 1.234,56) em uma única passada
+_BR_SEPARATORS = str.maketrans(',.', '.,')
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_date(value):
+    """
+    Converte 'AAAA-MM-DD' em date
+    
+    Caso comum via date.fromisoformat (sem interpretar string de formato);
+    strptime fica só para datas sem zero à esquerda ('2024-1-5'), que o
+    formato "%Y-%m-%d" sempre aceitou. Memoizado: as mesmas datas se
+    repetem entre os registros de uma listagem. Levanta ValueError para
+    formato ou data inválidos.
+    """
+    if len(value) == 10 and value[4] == '-' and value[7] == '-':
+        return date.fromisoformat(value)
+    return datetime.strptime(value, "%Y-%m-%d").date()
 
 class DateUtils:
     """Utilitários para manipulação de datas"""
@@ -21,7 +72,7 @@ class DateUtils:
         
         if isinstance(date_obj, str):
             try:
-                date_obj = datetime.strptime(date_obj, "%Y-%m-%d").date()
+                date_obj = _parse_iso_date(date_obj)
             except ValueError:
                 return date_obj
         
@@ -49,7 +100,7 @@ class DateUtils:
         
         if isinstance(target_date, str):
             try:
-                target_date = datetime.strptime(target_date, "%Y-%m-%d").date()
+                target_date = _parse_iso_date(target_date)
             except ValueError:
                 return None
         
@@ -68,7 +119,7 @@ class CurrencyUtils:
         
         try:
             value = float(value)
-            return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            return f"R$ {value:,.2f}".translate(_BR_SEPARATORS)
         except (ValueError, TypeError):
             return "R$ 0,00"
     
@@ -79,7 +130,7 @@ class CurrencyUtils:
             return 0.0
         
         # Remove símbolos e converte vírgula para ponto
-        clean_str = re.sub(r'[R$\s]', '', str(currency_str))
+        clean_str = _CURRENCY_STRIP_RE.sub('', str(currency_str))
         clean_str = clean_str.replace('.', '').replace(',', '.')
         
         try:
@@ -96,8 +147,7 @@ class ValidationUtils:
         if not email:
             return False
         
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return _EMAIL_RE.match(email) is not None
     
     @staticmethod
     def validate_phone(phone):
@@ -106,7 +156,7 @@ class ValidationUtils:
             return False
         
         # Remove caracteres não numéricos
-        clean_phone = re.sub(r'\D', '', phone)
+        clean_phone = phone.translate(_KEEP_DIGITS)
         
         # Verifica se tem 10 ou 11 dígitos
         return len(clean_phone) in [10, 11]
@@ -117,15 +167,10 @@ class ValidationUtils:
         if not placa:
             return False
         
-        placa = placa.upper().replace('-', '').replace(' ', '')
+        placa = placa.translate(_PLACA_PREP)
         
-        # Formato antigo: ABC1234
-        pattern_old = r'^[A-Z]{3}[0-9]{4}$'
-        
-        # Formato Mercosul: ABC1D23
-        pattern_mercosul = r'^[A-Z]{3}[0-9][A-Z][0-9]{2}$'
-        
-        return re.match(pattern_old, placa) or re.match(pattern_mercosul, placa)
+        # Formato antigo (ABC1234) ou Mercosul (ABC1D23)
+        return bool(_PLACA_OLD_RE.match(placa) or _PLACA_MERC_RE.match(placa))
     
     @staticmethod
     def format_placa(placa):
@@ -133,7 +178,7 @@ class ValidationUtils:
         if not placa:
             return ""
         
-        placa = placa.upper().replace('-', '').replace(' ', '')
+        placa = placa.translate(_PLACA_PREP)
         
         if len(placa) == 7:
             return f"{placa[:3]}-{placa[3:]}"
@@ -147,7 +192,7 @@ class ValidationUtils:
             return False
         
         # Remove caracteres não numéricos
-        cnpj = re.sub(r'\D', '', cnpj)
+        cnpj = cnpj.translate(_KEEP_DIGITS)
         
         # Verifica se tem 14 dígitos
         if len(cnpj) != 14:
@@ -165,7 +210,7 @@ class ValidationUtils:
         if not cnpj:
             return ""
         
-        cnpj = re.sub(r'\D', '', cnpj)
+        cnpj = cnpj.translate(_KEEP_DIGITS)
         
         if len(cnpj) == 14:
             return f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}"
@@ -175,7 +220,8 @@ class ValidationUtils:
 class StatusUtils:
     """Utilitários para formatação de status"""
     
-    STATUS_COLORS = {
+    # Chaves internadas: status vindos de sys.intern() casam por identidade
+    STATUS_COLORS = {sys.intern(k): v for k, v in {
         'Operacional': 'success',
         'Manutenção': 'warning',
         'Inativo': 'danger',
@@ -187,7 +233,22 @@ class StatusUtils:
         'Corretiva': 'warning',
         'Emergencial': 'danger',
         'Revisão': 'primary'
-    }
+    }.items()}
+    
+    # Montado uma vez na classe (antes era recriado a cada chamada)
+    STATUS_ICONS = {sys.intern(k): v for k, v in {
+        'Operacional': 'fas fa-check-circle',
+        'Manutenção': 'fas fa-wrench',
+        'Inativo': 'fas fa-times-circle',
+        'Agendada': 'fas fa-clock',
+        'Em Andamento': 'fas fa-cog fa-spin',
+        'Concluída': 'fas fa-check',
+        'Cancelada': 'fas fa-ban',
+        'Preventiva': 'fas fa-shield-alt',
+        'Corretiva': 'fas fa-tools',
+        'Emergencial': 'fas fa-exclamation-triangle',
+        'Revisão': 'fas fa-search'
+    }.items()}
     
     @staticmethod
     def get_status_color(status):
@@ -197,20 +258,17 @@ class StatusUtils:
     @staticmethod
     def get_status_icon(status):
         """Retorna o ícone Font Awesome para um status"""
-        icons = {
-            'Operacional': 'fas fa-check-circle',
-            'Manutenção': 'fas fa-wrench',
-            'Inativo': 'fas fa-times-circle',
-            'Agendada': 'fas fa-clock',
-            'Em Andamento': 'fas fa-cog fa-spin',
-            'Concluída': 'fas fa-check',
-            'Cancelada': 'fas fa-ban',
-            'Preventiva': 'fas fa-shield-alt',
-            'Corretiva': 'fas fa-tools',
-            'Emergencial': 'fas fa-exclamation-triangle',
-            'Revisão': 'fas fa-search'
-        }
-        return icons.get(status, 'fas fa-question')
+        return StatusUtils.STATUS_ICONS.get(status, 'fas fa-question')
+
+@functools.lru_cache(maxsize=256)
+def _ensure_dir_cached(path):
+    """
+    Cria o diretório uma única vez por processo
+    
+    Chamadas seguintes para o mesmo caminho não tocam o disco. Se o
+    diretório for removido enquanto o processo roda, não é recriado.
+    """
+    os.makedirs(path, exist_ok=True)
 
 class FileUtils:
     """Utilitários para manipulação de arquivos"""
@@ -218,25 +276,31 @@ class FileUtils:
     @staticmethod
     def ensure_directory(path):
         """Garante que um diretório existe"""
-        os.makedirs(path, exist_ok=True)
+        _ensure_dir_cached(os.fspath(path))
     
     @staticmethod
     def get_safe_filename(filename):
         """Retorna um nome de arquivo seguro"""
         # Remove caracteres problemáticos
-        safe_chars = re.sub(r'[<>:"/\\|?*]', '_', filename)
+        safe_chars = _UNSAFE_FILE_RE.sub('_', filename)
         
         # Remove espaços extras e pontos no final
-        safe_chars = re.sub(r'\s+', '_', safe_chars).strip('._')
+        safe_chars = _WS_RE.sub('_', safe_chars).strip('._')
         
         return safe_chars or 'arquivo'
     
     @staticmethod
-    def get_file_size_mb(file_path):
-        """Retorna o tamanho do arquivo em MB"""
+    def get_file_size_mb(file_path, stat_result=None):
+        """
+        Retorna o tamanho do arquivo em MB
+        
+        Quem já tem o os.stat_result do arquivo (ex.: listagem via
+        os.scandir) pode passá-lo em stat_result e evitar um novo stat.
+        """
         try:
-            size_bytes = os.path.getsize(file_path)
-            return round(size_bytes / (1024 * 1024), 2)
+            if stat_result is None:
+                stat_result = os.stat(file_path)
+            return round(stat_result.st_size * _BYTES_TO_MB, 2)
         except OSError:
             return None
 
@@ -244,10 +308,15 @@ class AlertUtils:
     """Utilitários para alertas e notificações"""
     
     @staticmethod
-    def get_maintenance_alerts(manutencoes, days_ahead=7):
-        """Retorna alertas de manutenções próximas"""
+    def get_maintenance_alerts(manutencoes, days_ahead=7, limit=None):
+        """
+        Retorna alertas de manutenções próximas
+        
+        Com limit, devolve só os N mais urgentes via heapq.nsmallest
+        (O(n log N)) em vez de ordenar a lista inteira.
+        """
         alerts = []
-        today = date.today()
+        today_ord = date.today().toordinal()
         
         for manutencao in manutencoes:
             if manutencao.get('status') != 'Agendada':
@@ -259,11 +328,12 @@ class AlertUtils:
             
             if isinstance(data_agendada, str):
                 try:
-                    data_agendada = datetime.strptime(data_agendada, "%Y-%m-%d").date()
+                    data_agendada = _parse_iso_date(data_agendada)
                 except ValueError:
                     continue
             
-            days_until = (data_agendada - today).days
+            # Diferença de ordinais: sem timedelta por registro
+            days_until = data_agendada.toordinal() - today_ord
             
             if days_until <= days_ahead:
                 alert_type = 'danger' if days_until <= 1 else 'warning' if days_until <= 3 else 'info'
@@ -276,11 +346,17 @@ class AlertUtils:
                     'manutencao_id': manutencao.get('id')
                 })
         
+        if limit is not None:
+            return heapq.nsmallest(limit, alerts, key=lambda x: x['days_until'])
         return sorted(alerts, key=lambda x: x['days_until'])
     
     @staticmethod
-    def get_stock_alerts(pecas, threshold_multiplier=1.5):
-        """Retorna alertas de estoque baixo"""
+    def get_stock_alerts(pecas, threshold_multiplier=1.5, limit=None):
+        """
+        Retorna alertas de estoque baixo
+        
+        Com limit, devolve só os N de menor estoque (heapq.nsmallest).
+        """
         alerts = []
         
         for peca in pecas:
@@ -305,6 +381,8 @@ class AlertUtils:
                 'peca_id': peca.get('id')
             })
         
+        if limit is not None:
+            return heapq.nsmallest(limit, alerts, key=lambda x: x['estoque_atual'])
         return sorted(alerts, key=lambda x: x['estoque_atual'])
 
 # Funções de conveniência para templates Jinja2
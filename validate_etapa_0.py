@@ -6,14 +6,20 @@ Script de validação da ETAPA 0
 Verifica se todas as mudanças foram aplicadas corretamente.
 """
 
+import mmap
 import os
 import sys
 from config import Config
 
+# 'psycopg2-binary' como aparece no requirements.txt em UTF-8 e em UTF-16-LE
+_PSYCOPG2_MARKERS = (b'psycopg2-binary', 'psycopg2-binary'.encode('utf-16-le'))
+
+# Prefixos de status montados uma única vez
+_STATUS_PREFIX = {True: "✅ ", False: "❌ "}
+
 def print_status(check, message):
     """Imprime status da verificação"""
-    symbol = "✅" if check else "❌"
-    print(f"{symbol} {message}")
+    print(_STATUS_PREFIX[bool(check)] + message)
     return check
 
 def main():
@@ -47,9 +53,23 @@ def main():
         'RESUMO_ETAPA_0.md'
     ]
     
+    # Uma listagem por diretório em vez de um stat por arquivo
+    presentes = {}
+    for diretorio in {os.path.dirname(arquivo) for arquivo in arquivos}:
+        try:
+            with os.scandir(diretorio or '.') as it:
+                presentes[diretorio] = {entry.name for entry in it}
+        except OSError:
+            presentes[diretorio] = set()
+    
+    # Linhas da seção acumuladas e escritas de uma vez (um write, não 18)
+    linhas = []
     for arquivo in arquivos:
-        exists = os.path.exists(arquivo)
-        all_ok = print_status(exists, f"{arquivo}") and all_ok
+        diretorio, nome = os.path.split(arquivo)
+        exists = nome in presentes[diretorio]
+        linhas.append(_STATUS_PREFIX[exists] + arquivo)
+        all_ok = exists and all_ok
+    sys.stdout.write("\n".join(linhas) + "\n")
     
     # 2. Verificar config.py
     print("\n⚙️  Verificando configurações...")
@@ -59,9 +79,16 @@ def main():
     # 3. Verificar requirements.txt
     print("\n📦 Verificando dependências...")
     try:
-        with open('requirements.txt', 'r', encoding='utf-8-sig') as f:
-            reqs = f.read()
-        all_ok = print_status('psycopg2-binary' in reqs, "psycopg2-binary no requirements.txt") and all_ok
+        # Busca em bytes via mmap, sem decodificar o arquivo. O
+        # requirements.txt pode estar em UTF-8 ou UTF-16 (gerado no
+        # Windows), então procuramos as duas codificações do nome.
+        with open('requirements.txt', 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:  # mmap não mapeia arquivo vazio
+                has_pg = False
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    has_pg = any(mm.find(marker) != -1 for marker in _PSYCOPG2_MARKERS)
+        all_ok = print_status(has_pg, "psycopg2-binary no requirements.txt") and all_ok
     except Exception as e:
         print(f"   ⚠️  Aviso ao ler requirements.txt: {e}")
         # Não falhar por isso, pois não é crítico para validação
@@ -5,13 +5,30 @@ Versão simplificada sem dependências de config.py
 
 import os
 import sys
+from collections import defaultdict
 
 DATABASE_URL = os.environ.get('DATABASE_URL', '')
 
+# Conexão única compartilhada por todas as verificações (um só handshake)
+_conn = None
+
 def get_connection():
-    """Retorna conexão PostgreSQL"""
-    import psycopg2
-    return psycopg2.connect(DATABASE_URL)
+    """Retorna a conexão PostgreSQL compartilhada (aberta na primeira chamada)"""
+    global _conn
+    if _conn is None:
+        import psycopg2
+        _conn = psycopg2.connect(DATABASE_URL)
+        # Só leituras: autocommit evita que um erro em uma verificação
+        # deixe a transação abortada para as seguintes
+        _conn.autocommit = True
+    return _conn
+
+def close_connection():
+    """Fecha a conexão compartilhada, se aberta"""
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
 
 def check_database():
     """Verifica conexão PostgreSQL"""
@@ -22,14 +39,10 @@ def check_database():
         return False
     
     try:
-        import psycopg2
         conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT version()")
-        version = cursor.fetchone()[0]
-        print(f"✅ PostgreSQL: {version.split(',')[0]}")
-        cursor.close()
-        conn.close()
+        # Versão enviada pelo servidor no handshake: sem consulta extra
+        version = conn.info.parameter_status('server_version')
+        print(f"✅ PostgreSQL: PostgreSQL {version}")
         return True
     except Exception as e:
         print(f"❌ Erro: {e}")
@@ -44,71 +57,114 @@ def check_migrations():
         cursor = conn.cursor()
         
         cursor.execute("""
-            SELECT version, name, success, applied_at 
+            SELECT version, name, success 
             FROM schema_migrations 
             ORDER BY version
         """)
         
-        migrations = cursor.fetchall()
+        # rowcount já vem com o resultado: itera o cursor direto, sem
+        # montar lista nem varrê-la de novo para contar as falhas
+        total = cursor.rowcount
         
-        if not migrations:
+        if not total:
             print("❌ Nenhuma migração aplicada!")
             return False
         
-        print(f"✅ {len(migrations)} migrações aplicadas:")
-        for version, name, success, applied_at in migrations:
+        print(f"✅ {total} migrações aplicadas:")
+        failed = 0
+        for version, name, success in cursor:
             status = "✅" if success else "❌"
             print(f"   {status} {version} - {name}")
+            if not success:
+                failed += 1
         
         # Verificar se todas tiveram sucesso
-        failed = [m for m in migrations if not m[2]]
         if failed:
-            print(f"❌ {len(failed)} migrações falharam!")
+            print(f"❌ {failed} migrações falharam!")
             return False
         
         # Esperamos 7 migrações
-        if len(migrations) < 7:
-            print(f"⚠️  Esperado: 7 migrações, Encontrado: {len(migrations)}")
+        if total < 7:
+            print(f"⚠️  Esperado: 7 migrações, Encontrado: {total}")
             return False
         
         cursor.close()
-        conn.close()
         return True
         
     except Exception as e:
         print(f"❌ Erro: {e}")
         return False
 
+# Tabelas novas da ETAPA 0 (tupla: ordem de exibição) e tabelas cujas FKs
+# são conferidas. Vão como list para a consulta: o psycopg2 só adapta list
+# para ARRAY (tupla vira lista de valores entre parênteses).
+EXPECTED_TABLES = ('clientes', 'servicos', 'manutencao_servicos', 'ordens_servico')
+FK_TABLES = EXPECTED_TABLES + ('veiculos',)
+
+# Sondagens de catálogo de check_tables, check_schema_changes, check_indexes
+# e check_foreign_keys em uma única ida ao banco. Cada linha vem marcada com
+# a verificação a que pertence; as colunas seguintes variam por verificação.
+# Sem ORDER BY: só as FKs são exibidas em ordem, e são ordenadas no Python.
+ALL_PROBES_SQL = """
+    SELECT 'tables' AS check_name, table_name::text AS k1,
+           NULL::text AS k2, NULL::text AS k3, NULL::text AS k4
+    FROM information_schema.tables
+    WHERE table_schema = 'public'
+    AND table_name = ANY(%(expected)s)
+    UNION ALL
+    SELECT 'schema', table_name::text, column_name::text,
+           data_type::text,
+           -- empresas mostra o default; veiculos mostra se aceita NULL
+           CASE WHEN table_name = 'empresas' THEN column_default::text
+                ELSE is_nullable::text END
+    FROM information_schema.columns
+    WHERE (table_name = 'empresas' AND column_name = 'tipo_operacao')
+       OR (table_name = 'veiculos' AND column_name = 'cliente_id')
+    UNION ALL
+    SELECT 'idx', tablename::text, indexname::text, NULL, NULL
+    FROM pg_indexes
+    WHERE schemaname = 'public'
+    AND indexname LIKE 'idx_%%'
+    UNION ALL
+    SELECT 'fk', t.relname::text, a.attname::text, f.relname::text, NULL
+    FROM pg_constraint c
+    JOIN pg_class t ON t.oid = c.conrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    JOIN pg_class f ON f.oid = c.confrelid
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY(c.conkey)
+    WHERE c.contype = 'f'
+    AND n.nspname = 'public'
+    AND t.relname = ANY(%(fk_tables)s)
+"""
+
+_probes = None
+
+def get_probes():
+    """Executa ALL_PROBES_SQL uma vez e devolve {check_name: [linhas]}"""
+    global _probes
+    if _probes is None:
+        cursor = get_connection().cursor()
+        cursor.execute(ALL_PROBES_SQL, {'expected': list(EXPECTED_TABLES), 'fk_tables': list(FK_TABLES)})
+        _probes = {}
+        for row in cursor.fetchall():
+            _probes.setdefault(row[0], []).append(row[1:])
+        cursor.close()
+    return _probes
+
 def check_tables():
     """Verifica novas tabelas"""
     print("\n📊 VERIFICANDO NOVAS TABELAS...")
     
-    expected_tables = ['clientes', 'servicos', 'manutencao_servicos', 'ordens_servico']
-    
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT table_name 
-            FROM information_schema.tables 
-            WHERE table_schema = 'public' 
-            AND table_name = ANY(%s)
-            ORDER BY table_name
-        """, (expected_tables,))
-        
-        found = [row[0] for row in cursor.fetchall()]
+        found = {row[0] for row in get_probes().get('tables', [])}
         
-        for table in expected_tables:
+        for table in EXPECTED_TABLES:
             if table in found:
                 print(f"✅ Tabela: {table}")
             else:
                 print(f"❌ Falta: {table}")
         
-        cursor.close()
-        conn.close()
-        
-        return len(found) == len(expected_tables)
+        return len(found) == len(EXPECTED_TABLES)
         
     except Exception as e:
         print(f"❌ Erro: {e}")
@@ -119,45 +175,25 @@ def check_schema_changes():
     print("\n🔧 VERIFICANDO ALTERAÇÕES NO SCHEMA...")
     
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        # (tabela, coluna) -> (data_type, default ou is_nullable)
+        cols = {(t, c): (dtype, extra) for t, c, dtype, extra in get_probes().get('schema', [])}
         
         # 1. Verificar tipo_operacao em empresas
-        cursor.execute("""
-            SELECT column_name, data_type, column_default 
-            FROM information_schema.columns 
-            WHERE table_name = 'empresas' 
-            AND column_name = 'tipo_operacao'
-        """)
-        
-        col = cursor.fetchone()
+        col = cols.get(('empresas', 'tipo_operacao'))
         if col:
-            print(f"✅ empresas.tipo_operacao: {col[1]} (default: {col[2]})")
+            print(f"✅ empresas.tipo_operacao: {col[0]} (default: {col[1]})")
         else:
             print("❌ empresas.tipo_operacao não existe!")
-            cursor.close()
-            conn.close()
             return False
         
         # 2. Verificar cliente_id em veiculos
-        cursor.execute("""
-            SELECT column_name, data_type, is_nullable 
-            FROM information_schema.columns 
-            WHERE table_name = 'veiculos' 
-            AND column_name = 'cliente_id'
-        """)
-        
-        col = cursor.fetchone()
+        col = cols.get(('veiculos', 'cliente_id'))
         if col:
-            print(f"✅ veiculos.cliente_id: {col[1]} (nullable: {col[2]})")
+            print(f"✅ veiculos.cliente_id: {col[0]} (nullable: {col[1]})")
         else:
             print("❌ veiculos.cliente_id não existe!")
-            cursor.close()
-            conn.close()
             return False
         
-        cursor.close()
-        conn.close()
         return True
         
     except Exception as e:
@@ -169,34 +205,18 @@ def check_indexes():
     print("\n📈 VERIFICANDO ÍNDICES...")
     
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT indexname, tablename 
-            FROM pg_indexes 
-            WHERE schemaname = 'public' 
-            AND indexname LIKE 'idx_%'
-            ORDER BY tablename, indexname
-        """)
-        
-        indexes = cursor.fetchall()
+        indexes = get_probes().get('idx', [])
         
         print(f"✅ {len(indexes)} índices encontrados")
         
         # Agrupar por tabela
-        tables = {}
-        for idx, table in indexes:
-            if table not in tables:
-                tables[table] = []
+        tables = defaultdict(list)
+        for table, idx, _, _ in indexes:
             tables[table].append(idx)
         
         for table, idxs in sorted(tables.items()):
             print(f"   {table}: {len(idxs)} índices")
         
-        cursor.close()
-        conn.close()
-        
         return len(indexes) > 0
         
     except Exception as e:
@@ -208,34 +228,13 @@ def check_foreign_keys():
     print("\n🔗 VERIFICANDO FOREIGN KEYS...")
     
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT
-                tc.table_name,
-                kcu.column_name,
-                ccu.table_name AS foreign_table
-            FROM information_schema.table_constraints tc
-            JOIN information_schema.key_column_usage kcu
-              ON tc.constraint_name = kcu.constraint_name
-            JOIN information_schema.constraint_column_usage ccu
-              ON ccu.constraint_name = tc.constraint_name
-            WHERE tc.constraint_type = 'FOREIGN KEY'
-            AND tc.table_name IN ('clientes', 'servicos', 'manutencao_servicos', 'ordens_servico', 'veiculos')
-            ORDER BY tc.table_name
-        """)
-        
-        fks = cursor.fetchall()
+        fks = sorted(get_probes().get('fk', []), key=lambda fk: fk[:3])
         
         print(f"✅ {len(fks)} foreign keys encontradas:")
-        for table, column, ref_table in fks:
-            if table in ['clientes', 'servicos', 'manutencao_servicos', 'ordens_servico'] or column == 'cliente_id':
+        for table, column, ref_table, _ in fks:
+            if table in EXPECTED_TABLES or column == 'cliente_id':
                 print(f"   {table}.{column} -> {ref_table}")
         
-        cursor.close()
-        conn.close()
-        
         return len(fks) > 0
         
     except Exception as e:
@@ -250,10 +249,18 @@ def check_system_compatibility():
         conn = get_connection()
         cursor = conn.cursor()
         
-        # Verificar se todas empresas têm tipo_operacao
-        cursor.execute("SELECT COUNT(*) FROM empresas WHERE tipo_operacao IS NULL")
-        null_count = cursor.fetchone()[0]
+        # Todas as contagens em uma consulta (empresas lida uma única vez)
+        cursor.execute("""
+            SELECT
+                COUNT(*) FILTER (WHERE tipo_operacao IS NULL),
+                COUNT(*) FILTER (WHERE tipo_operacao = 'FROTA'),
+                COUNT(*),
+                (SELECT COUNT(*) FROM veiculos WHERE cliente_id IS NULL)
+            FROM empresas
+        """)
+        null_count, frota_count, total_count, veiculos_frota = cursor.fetchone()
         
+        # Verificar se todas empresas têm tipo_operacao
         if null_count > 0:
             print(f"❌ {null_count} empresas sem tipo_operacao!")
             return False
@@ -261,22 +268,12 @@ def check_system_compatibility():
         print("✅ Todas empresas têm tipo_operacao")
         
         # Verificar se empresas existentes são FROTA
-        cursor.execute("SELECT COUNT(*) FROM empresas WHERE tipo_operacao = 'FROTA'")
-        frota_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM empresas")
-        total_count = cursor.fetchone()[0]
-        
         print(f"✅ {frota_count}/{total_count} empresas são FROTA")
         
         # Verificar veículos sem cliente_id (FROTA)
-        cursor.execute("SELECT COUNT(*) FROM veiculos WHERE cliente_id IS NULL")
-        veiculos_frota = cursor.fetchone()[0]
-        
         print(f"✅ {veiculos_frota} veículos no modo FROTA (cliente_id NULL)")
         
         cursor.close()
-        conn.close()
         return True
         
     except Exception as e:
@@ -290,25 +287,28 @@ def main():
     print("🎯 VALIDAÇÃO PÓS-DEPLOY FLY.IO - ETAPA 0")
     print("="*70)
     
-    results = {
-        'Conexão PostgreSQL': check_database(),
-        'Migrações': check_migrations(),
-        'Novas Tabelas': check_tables(),
-        'Alterações Schema': check_schema_changes(),
-        'Índices': check_indexes(),
-        'Foreign Keys': check_foreign_keys(),
-        'Sistema FROTA': check_system_compatibility()
-    }
+    checks = [
+        ('Conexão PostgreSQL', check_database),
+        ('Migrações', check_migrations),
+        ('Novas Tabelas', check_tables),
+        ('Alterações Schema', check_schema_changes),
+        ('Índices', check_indexes),
+        ('Foreign Keys', check_foreign_keys),
+        ('Sistema FROTA', check_system_compatibility),
+    ]
+    
+    results = [(name, check_func()) for name, check_func in checks]
+    close_connection()
     
     print("\n" + "="*70)
     print("📊 RESUMO DA VALIDAÇÃO")
     print("="*70)
     
-    for check, passed in results.items():
+    for check, passed in results:
         status = "✅" if passed else "❌"
         print(f"{status} {check}")
     
-    passed_count = sum(results.values())
+    passed_count = sum(1 for _, passed in results if passed)
     total_count = len(results)
     
     print("\n" + "="*70)
@@ -9,19 +9,57 @@ Executa dentro do container via SSH.
 import os
 import sys
 
+# Importado uma vez no módulo. Se falhar (config.py ou dotenv ausentes),
+# main() avisa logo na entrada em vez de cada verificação repetir o import
+try:
+    from config import Config
+    _CONFIG_ERROR = None
+except ImportError as e:
+    Config = None
+    _CONFIG_ERROR = e
+
+# Lido uma vez no import, direto do environment (sem config.py)
+DATABASE_URL = os.environ.get('DATABASE_URL', '')
+IS_POSTGRES = DATABASE_URL.startswith(('postgresql://', 'postgres://'))
+
+# Conexão única compartilhada por todas as verificações (um só handshake)
+_conn = None
+
+def get_connection():
+    """Retorna a conexão PostgreSQL compartilhada (aberta na primeira chamada)"""
+    global _conn
+    if _conn is None:
+        import psycopg2
+        _conn = psycopg2.connect(Config.DATABASE_URL)
+        # Só leituras: autocommit evita que um erro em uma verificação
+        # deixe a transação abortada para as seguintes
+        _conn.autocommit = True
+    return _conn
+
+
+def _scalar(cursor, query, params=None):
+    """Executa a consulta e devolve a primeira coluna da primeira linha (ou None)"""
+    cursor.execute(query, params)
+    row = cursor.fetchone()
+    return None if row is None else row[0]
+
+
+def close_connection():
+    """Fecha a conexão compartilhada, se aberta"""
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
+
+
 def check_database_connection():
     """Verifica conexão com PostgreSQL"""
     print("\n🔗 VERIFICANDO CONEXÃO COM BANCO DE DADOS...")
     
-    # Ler DATABASE_URL diretamente do environment (sem config.py)
-    DATABASE_URL = os.environ.get('DATABASE_URL', '')
-    
     if not DATABASE_URL:
         print("❌ DATABASE_URL não configurada!")
         return False
     
-    IS_POSTGRES = 'postgresql://' in DATABASE_URL or 'postgres://' in DATABASE_URL
-    
     if not IS_POSTGRES:
         print("❌ Banco não é PostgreSQL!")
         print(f"   DATABASE_URL: {DATABASE_URL[:50]}...")
@@ -31,14 +69,10 @@ def check_database_connection():
     print(f"✅ Banco: PostgreSQL")
     
     try:
-        import psycopg2
-        conn = psycopg2.connect(DATABASE_URL)
-        cursor = conn.cursor()
-        cursor.execute("SELECT version()")
-        version = cursor.fetchone()[0]
-        print(f"✅ PostgreSQL conectado: {version.split(',')[0]}")
-        cursor.close()
-        conn.close()
+        conn = get_connection()
+        # Versão enviada pelo servidor no handshake: sem consulta extra
+        version = conn.info.parameter_status('server_version')
+        print(f"✅ PostgreSQL conectado: PostgreSQL {version}")
         return True
     except Exception as e:
         print(f"❌ Erro ao conectar: {e}")
@@ -50,35 +84,24 @@ def check_migrations():
     print("\n📋 VERIFICANDO MIGRAÇÕES...")
     
     try:
-        from config import Config
-        import psycopg2
-        
-        conn = psycopg2.connect(Config.DATABASE_URL)
+        conn = get_connection()
         cursor = conn.cursor()
         
-        # Verificar tabela de migrações
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                AND table_name = 'schema_migrations'
-            )
-        """)
-        
-        if not cursor.fetchone()[0]:
+        # Verificar tabela de migrações (to_regclass: direto no catálogo)
+        if not _scalar(cursor, "SELECT to_regclass('public.schema_migrations') IS NOT NULL"):
             print("❌ Tabela schema_migrations não existe!")
             print("   Execute: python run_migrations.py")
             cursor.close()
-            conn.close()
             return False
         
-        # Contar migrações aplicadas
+        # Migrações aplicadas: uma consulta serve para contar e para listar
         cursor.execute("""
-            SELECT COUNT(*) 
+            SELECT version, name 
             FROM schema_migrations 
             WHERE success = TRUE
+            ORDER BY version
         """)
-        count = cursor.fetchone()[0]
+        count = cursor.rowcount
         
         if count == 7:
             print(f"✅ Todas as 7 migrações aplicadas com sucesso")
@@ -86,22 +109,14 @@ def check_migrations():
             print(f"⚠️  Apenas {count}/7 migrações aplicadas")
             
             # Listar migrações aplicadas
-            cursor.execute("""
-                SELECT version, name, applied_at 
-                FROM schema_migrations 
-                WHERE success = TRUE
-                ORDER BY version
-            """)
             print("\n   Migrações aplicadas:")
-            for row in cursor.fetchall():
-                print(f"   ✅ {row[0]} - {row[1]}")
+            for version, name in cursor:
+                print(f"   ✅ {version} - {name}")
             
             cursor.close()
-            conn.close()
             return count == 7
         
         cursor.close()
-        conn.close()
         return True
         
     except Exception as e:
@@ -114,10 +129,7 @@ def check_new_tables():
     print("\n📊 VERIFICANDO NOVAS TABELAS...")
     
     try:
-        from config import Config
-        import psycopg2
-        
-        conn = psycopg2.connect(Config.DATABASE_URL)
+        conn = get_connection()
         cursor = conn.cursor()
         
         tabelas_esperadas = [
@@ -127,21 +139,21 @@ def check_new_tables():
             'ordens_servico'
         ]
         
+        # Uma consulta para as quatro tabelas (em vez de um EXISTS por tabela)
+        cursor.execute("""
+            SELECT table_name 
+            FROM information_schema.tables 
+            WHERE table_schema = 'public' 
+            AND table_name = ANY(%s)
+        """, (tabelas_esperadas,))
+        encontradas = {row[0] for row in cursor.fetchall()}
+        
         for tabela in tabelas_esperadas:
-            cursor.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = 'public' 
-                    AND table_name = %s
-                )
-            """, (tabela,))
-            
-            exists = cursor.fetchone()[0]
+            exists = tabela in encontradas
             symbol = "✅" if exists else "❌"
             print(f"{symbol} Tabela {tabela}")
         
         cursor.close()
-        conn.close()
         return True
         
     except Exception as e:
@@ -154,43 +166,33 @@ def check_schema_changes():
     print("\n🔧 VERIFICANDO ALTERAÇÕES NO SCHEMA...")
     
     try:
-        from config import Config
-        import psycopg2
-        
-        conn = psycopg2.connect(Config.DATABASE_URL)
+        conn = get_connection()
         cursor = conn.cursor()
         
-        # Verificar coluna tipo_operacao em empresas
+        # As duas colunas em uma única consulta (um parse/plan, uma ida ao banco)
         cursor.execute("""
-            SELECT column_name, data_type, column_default
+            SELECT table_name, column_name, data_type, column_default
             FROM information_schema.columns 
-            WHERE table_name = 'empresas' 
-            AND column_name = 'tipo_operacao'
+            WHERE (table_name = 'empresas' AND column_name = 'tipo_operacao')
+               OR (table_name = 'veiculos' AND column_name = 'cliente_id')
         """)
+        cols = {(r[0], r[1]): r[2:] for r in cursor.fetchall()}
         
-        row = cursor.fetchone()
+        # Verificar coluna tipo_operacao em empresas
+        row = cols.get(('empresas', 'tipo_operacao'))
         if row:
             print(f"✅ Coluna tipo_operacao existe em empresas")
-            print(f"   Tipo: {row[1]}, Default: {row[2]}")
+            print(f"   Tipo: {row[0]}, Default: {row[1]}")
         else:
             print("❌ Coluna tipo_operacao NÃO existe em empresas")
         
         # Verificar coluna cliente_id em veiculos
-        cursor.execute("""
-            SELECT column_name, data_type
-            FROM information_schema.columns 
-            WHERE table_name = 'veiculos' 
-            AND column_name = 'cliente_id'
-        """)
-        
-        row = cursor.fetchone()
-        if row:
+        if ('veiculos', 'cliente_id') in cols:
             print(f"✅ Coluna cliente_id existe em veiculos")
         else:
             print("❌ Coluna cliente_id NÃO existe em veiculos")
         
         cursor.close()
-        conn.close()
         return True
         
     except Exception as e:
@@ -203,20 +205,15 @@ def check_indexes():
     print("\n📈 VERIFICANDO ÍNDICES...")
     
     try:
-        from config import Config
-        import psycopg2
-        
-        conn = psycopg2.connect(Config.DATABASE_URL)
+        conn = get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
+        count = _scalar(cursor, """
             SELECT COUNT(*) 
             FROM pg_indexes 
             WHERE schemaname = 'public' 
             AND indexname LIKE 'idx_%'
         """)
-        
-        count = cursor.fetchone()[0]
         print(f"✅ {count} índices criados (prefixo idx_)")
         
         # Listar alguns índices importantes
@@ -234,7 +231,6 @@ def check_indexes():
             print(f"   • {row[0]} em {row[1]}")
         
         cursor.close()
-        conn.close()
         return True
         
     except Exception as e:
@@ -247,27 +243,25 @@ def check_foreign_keys():
     print("\n🔗 VERIFICANDO FOREIGN KEYS...")
     
     try:
-        from config import Config
-        import psycopg2
-        
-        conn = psycopg2.connect(Config.DATABASE_URL)
+        conn = get_connection()
         cursor = conn.cursor()
         
+        # Direto no pg_catalog: as views do information_schema viram joins
+        # bem mais pesados sobre o mesmo catálogo
         cursor.execute("""
             SELECT 
-                tc.table_name,
-                kcu.column_name,
-                ccu.table_name AS foreign_table_name
-            FROM information_schema.table_constraints AS tc 
-            JOIN information_schema.key_column_usage AS kcu
-                ON tc.constraint_name = kcu.constraint_name
-                AND tc.table_schema = kcu.table_schema
-            JOIN information_schema.constraint_column_usage AS ccu
-                ON ccu.constraint_name = tc.constraint_name
-                AND ccu.table_schema = tc.table_schema
-            WHERE tc.constraint_type = 'FOREIGN KEY'
-            AND tc.table_name IN ('clientes', 'servicos', 'veiculos', 'manutencao_servicos', 'ordens_servico')
-            ORDER BY tc.table_name
+                t.relname AS table_name,
+                a.attname AS column_name,
+                f.relname AS foreign_table_name
+            FROM pg_constraint c
+            JOIN pg_class t ON t.oid = c.conrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            JOIN pg_class f ON f.oid = c.confrelid
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY(c.conkey)
+            WHERE c.contype = 'f'
+            AND n.nspname = 'public'
+            AND t.relname IN ('clientes', 'servicos', 'veiculos', 'manutencao_servicos', 'ordens_servico')
+            ORDER BY t.relname, a.attname
         """)
         
         fks = cursor.fetchall()
@@ -277,7 +271,6 @@ def check_foreign_keys():
             print(f"   • {fk[0]}.{fk[1]} → {fk[2]}")
         
         cursor.close()
-        conn.close()
         return True
         
     except Exception as e:
@@ -290,31 +283,24 @@ def check_sistema_atual():
     print("\n🚗 VERIFICANDO SISTEMA FROTA (COMPATIBILIDADE)...")
     
     try:
-        from config import Config
-        import psycopg2
-        
-        conn = psycopg2.connect(Config.DATABASE_URL)
+        conn = get_connection()
         cursor = conn.cursor()
         
-        # Testar queries básicas
-        cursor.execute("SELECT COUNT(*) FROM veiculos")
-        veiculos = cursor.fetchone()[0]
+        # Testar queries básicas (as quatro contagens em uma ida ao banco)
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM veiculos),
+                (SELECT COUNT(*) FROM manutencoes),
+                (SELECT COUNT(*) FROM pecas),
+                (SELECT COUNT(*) FROM empresas)
+        """)
+        veiculos, manutencoes, pecas, empresas = cursor.fetchone()
         print(f"✅ Veículos: {veiculos} registros")
-        
-        cursor.execute("SELECT COUNT(*) FROM manutencoes")
-        manutencoes = cursor.fetchone()[0]
         print(f"✅ Manutenções: {manutencoes} registros")
-        
-        cursor.execute("SELECT COUNT(*) FROM pecas")
-        pecas = cursor.fetchone()[0]
         print(f"✅ Peças: {pecas} registros")
-        
-        cursor.execute("SELECT COUNT(*) FROM empresas")
-        empresas = cursor.fetchone()[0]
         print(f"✅ Empresas: {empresas} registros")
         
         cursor.close()
-        conn.close()
         return True
         
     except Exception as e:
@@ -328,6 +314,11 @@ def main():
     print("🎯 VALIDAÇÃO PÓS-DEPLOY FLY.IO - ETAPA 0")
     print("="*70)
     
+    if _CONFIG_ERROR is not None:
+        print(f"\n❌ Não foi possível importar config.py: {_CONFIG_ERROR}")
+        print("   Execute a partir da raiz do projeto, com as dependências instaladas.")
+        return 1
+    
     checks = [
         ("Conexão PostgreSQL", check_database_connection),
         ("Migrações", check_migrations),
@@ -348,6 +339,8 @@ def main():
             print(f"\n❌ Erro inesperado em {name}: {e}")
             results.append((name, False))
     
+    close_connection()
+    
     # Resumo
     print("\n" + "="*70)
     print("📊 RESUMO DA VALIDAÇÃO")